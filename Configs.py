@@ -1,7 +1,124 @@
+import functools
+import hashlib
 import logging
+import math
+from collections import OrderedDict
 from collections.abc import Mapping
 import numpy as np
 
+# Validated Configs objects keyed by a digest of the keyword arguments used to build them, least recently used first.
+# Holds at most _CACHE_SIZE objects so parameter sweeps do not grow it without bound. See Configs.build
+_cache = OrderedDict()
+_CACHE_SIZE = 128
+
+# Types accepted for integer parameters. Accepted values are stored as int
+_INT_TYPES = (int, np.integer)
+
+# Validation error messages raised through _fail, keyed by the check that fails
+_MESSAGES = {
+    'alphaNegative': "Alpha value cannot be less than 0",
+    'alphaListMissing': "alphaValueList must be specified if alphaValueOption=Varied is chosen",
+    'alphaListLength': "An alpha value must be input for each firm",
+    'alphaOption': "Unknown option chosen for alphaOption",
+    'covarianceMissing': "Covariance matrix not initialized",
+    'covarianceType': "Covariance matrix must be an NumpPy array",
+    'covarianceRange': "Invalid values for covariance matrix. Must be [0, 1]",
+    'calcPeriodsExceedHistory': "historyTime must be greater than or equal to numTimePeriodForCalc",
+    'riskToleranceLow': "Risk tolerance value cannot be less than 0",
+    'riskToleranceHigh': "Risk tolerance value cannot be greater than 1. (Risk tolerance is equivalent to "
+                         "desired return, and return cannot be greater than 1.)",
+    'shipDelayExceedsHistory': "Must have more historical time periods than shipping delay value",
+    'shipDelayType': "Shipping delay value must be an int",
+    'shipDelayNegative': "Shipping delay values cannot be less than 0",
+    'shipDelayListMissing': "shipDelayList must be specified if shipDelayOption=Varied is chosen",
+    'shipDelayListLength': "A ship delay value must be input for each firm",
+    'shipDelayListExceedsHistory': "Must have more historical time periods than maximum shipping delay value",
+    'shipDelayListType': "All shipping delay values must be int",
+    'shipDelayOption': "Unknown option chosen for shipDelayOption",
+    'defaultShocksRunTime': "Default runtime not chosen, therefore default shocks cannot be chosen",
+    'shocksType': "Shocks must be an NumpPy array",
+    'shockAfterEnd': "Cannot have shock value after simulation ends",
+    'shockBeforeStart': "Cannot have shock value in time period before 0",
+    'tooManyShocks': "More shock periods than total time periods",
+    'wholesalerProfileLength': "Length of wholesaler profile must be 2",
+    'wholesalerProfileSum': "Sum of wholesaler profile must equal 1",
+    'demandMuType': "Mu value must be an int",
+    'demandMuRange': "Mu Value cannot be less than 0",
+    'demandStdType': "Variance must be an int",
+    'demandStdRange': "Variance cannot be less than 0",
+    'historicalReturnRuleOptionType': "Historical return rule option must be an integer value",
+    'historicalReturnRuleOptionRange': "Invalid option for historical return rule: must be 1, 2, or 3",
+    'historyTimeType': "Historical time must be an int",
+    'historyTimeRange': "Historical time cannot be a value less than 0",
+    'numIterationsType': "Number of iterations must be an int",
+    'numIterationsRange': "Number of iterations must be 1 or greater",
+    'numTimePeriodsForCalcType': "Number of time periods for return calculation must be an int",
+    'numTimePeriodsForCalcRange': "Number of time periods for return calculation cannot be less than 1",
+    'runTimeType': "Runtime must be an int",
+    'runTimeRange': "Runtime cannot be a value less than 0",
+    'smoothingValueType': "Smoothing value must be an int",
+    'smoothingValueRange': "Smoothing value cannot be less than 1",
+    'acreageRange': "Acreage must be a positive number",
+    'miles_mexicoRange': "Miles from Mexico must be non-negative",
+    'miles_usRange': "Miles from US border must be non-negative",
+    'border_delayRange': "Border delay must be non-negative",
+    'shipment_sizeRange': "Shipment size must be a positive number",
+    'storage_timeRange': "Storage time must be non-negative"}
+
+# Shocks used when none are given. Read-only; each Configs object stores its own copy
+_DEFAULT_SHOCKS = np.array([[50, 1], [250, -.8]])
+_DEFAULT_SHOCKS.setflags(write=False)
+
+
+def _readOnly(array):
+    """
+    Returns a read-only copy of array. The array is always copied: a read-only array can still be changed through its
+    base or another view, or be made writeable again, by whoever owns it, and that would change the Configs object.
+
+    :param np.ndarray array:
+        The array to store on a Configs object
+
+    :return:
+        np.ndarray
+    """
+    array = np.array(array, copy=True)
+    array.setflags(write=False)
+    return array
+
+
+def _fail(messageKey, exceptionType=ValueError):
+    """
+    Logs and raises the validation error stored under messageKey in _MESSAGES.
+
+    :param str messageKey:
+        Key of the message in _MESSAGES
+    :param type exceptionType:
+        The exception class to raise (ValueError unless the check is a type check)
+
+    :return:
+        Never returns
+    """
+    message = _MESSAGES[messageKey]
+    logging.error(message)
+    raise exceptionType(message)
+
+
+@functools.lru_cache(maxsize=128, typed=True)
+def _uniformTuple(value, length):
+    """
+    Returns a tuple repeating value length times. Cached so identical per-firm parameter tuples are shared. The cache
+    is typed, so 1, 1.0, and True are kept apart rather than sharing the first tuple built.
+
+    :param value:
+        The value given to every firm
+    :param int length:
+        The number of firms
+
+    :return:
+        tuple
+    """
+    return (value,) * length
+
 
 class Configs(Mapping):
     """
@@ -18,7 +135,7 @@ class Configs(Mapping):
         maintained as safety stock each time period.
     alphaValueList: list
         Need only if 'Varied' is chosen for alphaOption. A list of values where each entry represents the percent
-        of inventory that is maintained as safety stock each time period for that specific firm.
+        of inventory that is maintained as safety stock each time period for that specific firm. Stored as a tuple.
     covarianceMatrix: np array
         A 2x2 array representing the covariance in return between firm 2 and 3, both suppliers for firm 1
     demandMu: int
@@ -55,7 +172,7 @@ class Configs(Mapping):
         The amount of time periods the simulation will run (not including historical time)
     shipDelayList: list
         A list where each entry is a value representing an individual firm's shipping delay value. Only required if
-        shipDelayOption =  'Varied'
+        shipDelayOption =  'Varied'. Stored as a tuple.
     shipDelayOption: str
         Takes value of 'Uniform' or 'Varied'. Uniform means all firms in the simulation have the same shipDelayValue.
     shipDelayValue: int
@@ -79,7 +196,7 @@ class Configs(Mapping):
             [future demand = (current demand + current forecasted demand) / 2]
     wholesalerProfile: list
         A list where each entry is a float representing the percentage of supplies that will be ordered from a
-        particular supplier. Must sum to 1.
+        particular supplier. Must sum to 1. Stored as a tuple.
 
         Currently the simulation only allows two suppliers for the wholesaler. Thus, index 0
         is the percentage firm 1 (wholesaler) buys from firm 2, and index 1 is the percentage firm 1 buys from firm
@@ -91,11 +208,86 @@ class Configs(Mapping):
         Takes value of 'Optimize' or 'Default'. If optimize is chosen, every time period the wholesaler will try to
         optimize their supplier portfolio. Otherwise, the wholesaler will never change their portfolio.
 
+    Configs objects are frozen once __init__ finishes; setting an attribute afterwards raises AttributeError.
+
     Instance Methods
     ---------
 
+    Class Methods
+    ---------
+    build(**kwargs)
+        Returns a validated Configs object, reusing one from an earlier call with the same arguments when possible.
+
     """
 
+    __slots__ = ('graphName',
+                 'numAgents',
+                 'alphaOption',
+                 'alphaValue',
+                 'alphaValueList',
+                 'covarianceMatrix',
+                 'demandMu',
+                 'demandStd',
+                 'historicalReturnRuleOption',
+                 'historyTime',
+                 'numIterations',
+                 'numTimePeriodsForCalc',
+                 'riskTolerance',
+                 'runTime',
+                 'acreage',
+                 'miles_mexico',
+                 'miles_us',
+                 'border_delay',
+                 'shipment_size',
+                 'storage_time',
+                 'shipDelayOption',
+                 'shipDelayValue',
+                 'shipDelayList',
+                 'shocks',
+                 'smoothingValue',
+                 'wholesalerProfileOption',
+                 'wholesalerProfile',
+                 '_frozen')
+
+    # Fixed cost/environment values shared by every configuration
+    cost_per_acre = 6975            # USD per acre of lettuce farming
+    cpm_us = 1.24                   # USD cost per mile in the US
+    cpm_mexico = 1.03               # USD cost per mile in Mexico
+    emission_per_acre = 4107        # lbs CO2 per acre. (right now this number is made up)
+    emission_per_mile = 3.742       # lbs CO2 per mile
+    water_per_acre = 652000         # gallons per acre annually. (this needs to be adjusted to account per truck somehow)
+    kwh_per_pallet_per_day = 0.914
+    pallet_weight_lb = 1540
+    _CONSTANTS = ('cost_per_acre',
+                  'cpm_us',
+                  'cpm_mexico',
+                  'emission_per_acre',
+                  'emission_per_mile',
+                  'water_per_acre',
+                  'kwh_per_pallet_per_day',
+                  'pallet_weight_lb')
+    _FIELDS = __slots__[:-1] + _CONSTANTS  # Every slot but _frozen
+
+    # Integer parameters checked against [lowest, highest]: (attribute, lowest allowed value, highest allowed value).
+    # Failures raise the '<attribute>Type' or '<attribute>Range' entry of _MESSAGES
+    _SCHEMA = (('demandMu', 0, math.inf),
+               ('demandStd', 0, math.inf),
+               ('historicalReturnRuleOption', 1, 3),
+               ('historyTime', 0, math.inf),
+               ('numIterations', 1, math.inf),
+               ('numTimePeriodsForCalc', 1, math.inf),
+               ('runTime', 0, math.inf),
+               ('smoothingValue', 1, math.inf))
+
+    # Optional global supply chain parameters: (attribute, warning when unset, whether 0 is allowed).
+    # Out of range values raise the '<attribute>Range' entry of _MESSAGES
+    _SUPPLY_CHAIN_SCHEMA = (('acreage', "Acreage is not set; defaulting to None", False),
+                            ('miles_mexico', "Miles from Mexico to border is not set; defaulting to None", True),
+                            ('miles_us', "Miles from border to destination is not set; defaulting to None", True),
+                            ('border_delay', "Border delay is not set; defaulting to None", True),
+                            ('shipment_size', "Shipment size is not set; defaulting to None", False),
+                            ('storage_time', "Storage time is not set; defaulting to None", True))
+
     def __init__(self,
                  runTime=500,
                  alphaOption='Uniform',
@@ -123,314 +315,132 @@ class Configs(Mapping):
                  shipment_size = None,
                  storage_time = None
                  ):
+        object.__setattr__(self, '_frozen', False)
+
+        # Phase 1: assign the parameters as given
         self.graphName = 'Kite'  # Cannot change this currently
         self.numAgents = 5  # Cannot change this currently
-
         self.alphaOption = alphaOption
-        logging.info(f"Set alphaOption to {self.alphaOption}")
         self.alphaValue = alphaValue
-        logging.info(f"Set alphaValue to {self.alphaValue}")
-        if alphaOption == 'Uniform':
-            if alphaValue < 0:
-                message = "Alpha value cannot be less than 0"
-                logging.error(message)
-                raise Exception(message)
-            self.alphaValueList = [alphaValue, alphaValue, alphaValue, alphaValue, alphaValue]
-            logging.info(f"Set alphaValueList to {self.alphaValueList}")
-        elif alphaOption == 'Varied':
-            if alphaValueList is None:
-                message = "alphaValueList must be specified if alphaValueOption=Varied is chosen"
-                logging.error(message)
-                raise Exception(message)
-            if len(alphaValueList) != self.numAgents:
-                message = "An alpha value must be input for each firm"
-                logging.error(message)
-                raise Exception(message)
-            for value in alphaValueList:
-                if value < 0:
-                    message = "Alpha value cannot be less than 0"
-                    logging.error(message)
-                    raise Exception(message)
-            self.alphaValueList = alphaValueList
-            logging.info(f"Set alphaValueList to {self.alphaValueList}")
-        else:
-            message = "Unknown option chosen for alphaOption"
-            logging.error(message)
-            raise Exception(message)
-
-        self.covarianceMatrix = covarianceMatrix
-        logging.info(f"Set covarianceMatrix to {self.covarianceMatrix}")
-        if covarianceMatrix is None:
-            message = "Covariance matrix not initialized"
-            logging.error(message)
-            raise Exception(message)
-        if not isinstance(covarianceMatrix, np.ndarray):
-            message = "Covariance matrix must be an NumpPy array"
-            logging.error(message)
-            raise Exception(message)
-        test1 = covarianceMatrix > 1
-        test2 = covarianceMatrix < 0
-        if np.sum(test1) + np.sum(test2) != 0:
-            message = "Invalid values for covariance matrix. Must be [0, 1]"
-            logging.error(message)
-            raise Exception(message)
-
         self.demandMu = demandMu
-        logging.info(f"Set demandMu to {self.demandMu}")
-        if not isinstance(demandMu, int):
-            message = "Mu value must be an int"
-            logging.error(message)
-            raise TypeError(message)
-        if demandMu < 0:
-            message = "Mu Value cannot be less than 0"
-            logging.error(message)
-            raise Exception(message)
-
         self.demandStd = demandStd
-        logging.info(f"Set demandStd to {self.demandStd}")
-        if not isinstance(demandStd, int):
-            message = "Variance must be an int"
-            logging.error(message)
-            raise TypeError(message)
-        if demandStd < 0:
-            message = "Variance cannot be less than 0"
-            logging.error(message)
-            raise Exception(message)
-
         self.historicalReturnRuleOption = historicalReturnRuleOption
-        logging.info(f"Set historicalReturnRuleOption to {self.historicalReturnRuleOption}")
-        if not isinstance(historicalReturnRuleOption, int):
-            message = "Historical return rule option must be an integer value"
-            logging.error(message)
-            raise TypeError(message)
-        if historicalReturnRuleOption > 3 or historicalReturnRuleOption < 1:
-            message = "Invalid option for historical return rule: must be 1, 2, or 3"
-            logging.error(message)
-            raise Exception(message)
-
         self.historyTime = historyTime  # Number of historical time periods. Used for firm calculations
-        logging.info(f"Set historyTime to {self.historyTime}")
-        if not isinstance(historyTime, int):
-            message = "Historical time must be an int"
-            logging.error(message)
-            raise TypeError(message)
-        if historyTime < 0:
-            message = "Historical time cannot be a value less than 0"
-            logging.error(message)
-            raise Exception(message)
-
         self.numIterations = numIterations
-        if not isinstance(self.numIterations, int):
-            message = "Number of iterations must be an int"
-            logging.error(message)
-            raise TypeError(message)
-        if self.numIterations <= 0:
-            message = "Number of iterations must be 1 or greater"
-            logging.error(message)
-            raise Exception(message)
-
         self.numTimePeriodsForCalc = numTimePeriodsForCalc
-        logging.info(f"Set numTimePeriodsForCalc to {self.numTimePeriodsForCalc}")
-        if not isinstance(numTimePeriodsForCalc, int):
-            message = "Number of time periods for return calculation must be an int"
-            logging.error(message)
-            raise TypeError(message)
-        if numTimePeriodsForCalc < 1:
-            message = "Number of time periods for return calculation cannot be less than 1"
-            logging.error(message)
-            raise Exception(message)
-        if numTimePeriodsForCalc > historyTime:
-            message = "historyTime must be greater than or equal to numTimePeriodForCalc"
-            logging.error(message)
-            raise Exception(message)
-
-        self.riskTolerance = riskTolerance
-        logging.info(f"Set riskTolerance to {self.riskTolerance}")
-        if riskTolerance <= 0:
-            message = "Risk tolerance value cannot be less than 0"
-            logging.error(message)
-            raise Exception(message)
-        if riskTolerance > 1:
-            message = "Risk tolerance value cannot be greater than 1. (Risk tolerance is equivalent to "
-            "desired return, and return cannot be greater than 1."
-            logging.error(message)
-            raise Exception(message)
-
         self.runTime = runTime  # Simulation run time not including historical time periods
-        logging.info(f"Set runTime to {self.runTime}")
-        if not isinstance(runTime, int):
-            message = "Runtime must be an int"
-            logging.error(message)
-            raise TypeError(message)
-        if runTime < 0:
-            message = "Runtime cannot be a value less than 0"
-            logging.error(message)
-            raise Exception(message)
-        
+        self.smoothingValue = smoothingValue
+        self.riskTolerance = riskTolerance
         #These are the variables for the global supply chain.
         self.acreage = acreage
-        logging.info(f"Set acreage to {self.acreage}")
-        if self.acreage is None:
-            logging.warning("Acreage is not set; defaulting to None")
-        elif self.acreage <= 0:
-            message = "Acreage must be a positive number"
-            logging.error(message)
-            raise Exception(message)
-
         self.miles_mexico = miles_mexico
-        logging.info(f"Set miles_mexico to {self.miles_mexico}")
-        if self.miles_mexico is None:
-            logging.warning("Miles from Mexico to border is not set; defaulting to None")
-        elif self.miles_mexico < 0:
-            message = "Miles from Mexico must be non-negative"
-            logging.error(message)
-            raise Exception(message)
-
         self.miles_us = miles_us
-        logging.info(f"Set miles_us to {self.miles_us}")
-        if self.miles_us is None:
-            logging.warning("Miles from border to destination is not set; defaulting to None")
-        elif self.miles_us < 0:
-            message = "Miles from US border must be non-negative"
-            logging.error(message)
-            raise Exception(message)
-
         self.border_delay = border_delay
-        logging.info(f"Set border_delay to {self.border_delay}")
-        if self.border_delay is None:
-            logging.warning("Border delay is not set; defaulting to None")
-        elif self.border_delay < 0:
-            message = "Border delay must be non-negative"
-            logging.error(message)
-            raise Exception(message)
-
         self.shipment_size = shipment_size
-        logging.info(f"Set shipment_size to {self.shipment_size}")
-        if self.shipment_size is None:
-            logging.warning("Shipment size is not set; defaulting to None")
-        elif self.shipment_size <= 0:
-            message = "Shipment size must be a positive number"
-            logging.error(message)
-            raise Exception(message)
-
         self.storage_time = storage_time
-        logging.info(f"Set storage_time to {self.storage_time}")
-        if self.storage_time is None:
-            logging.warning("Storage time is not set; defaulting to None")
-        elif self.storage_time < 0:
-            message = "Storage time must be non-negative"
-            logging.error(message)
-            raise Exception(message)
-
-
         self.shipDelayOption = shipDelayOption
-        logging.info(f"Set shipDelayOption to {self.shipDelayOption}")
         self.shipDelayValue = shipDelayValue
-        logging.info(f"Set shipDelayValue to {self.shipDelayValue}")
+        self.wholesalerProfileOption = wholesalerProfileOption  # Options are optimization or default (no optimization)
+        defaultShocks = shocks is None
+        if defaultShocks:
+            shocks = _DEFAULT_SHOCKS
+        if wholesalerProfile is None:
+            wholesalerProfile = [0.5, 0.5]
+
+        # Phase 2: check each parameter on its own
+        for attribute, lowest, highest in self._SCHEMA:
+            value = getattr(self, attribute)
+            if not (isinstance(value, _INT_TYPES) and lowest <= value <= highest):
+                self._validateScalar(attribute, value, lowest, highest)
+            setattr(self, attribute, int(value))
+        if riskTolerance <= 0:
+            _fail('riskToleranceLow')
+        if riskTolerance > 1:
+            _fail('riskToleranceHigh')
+        for attribute, unsetMessage, allowZero in self._SUPPLY_CHAIN_SCHEMA:
+            value = getattr(self, attribute)
+            if value is None:
+                logging.warning(unsetMessage)
+            elif value < 0 or (value == 0 and not allowZero):
+                _fail(f'{attribute}Range')
+
+        if alphaOption == 'Uniform':
+            if alphaValue < 0:
+                _fail('alphaNegative')
+            self.alphaValueList = _uniformTuple(alphaValue, self.numAgents)
+        elif alphaOption == 'Varied':
+            if alphaValueList is None:
+                _fail('alphaListMissing')
+            if len(alphaValueList) != self.numAgents:
+                _fail('alphaListLength')
+            for value in alphaValueList:
+                if value < 0:
+                    _fail('alphaNegative')
+            self.alphaValueList = tuple(alphaValueList)
+        else:
+            _fail('alphaOption')
+
+        if covarianceMatrix is None:
+            _fail('covarianceMissing')
+        if not isinstance(covarianceMatrix, np.ndarray):
+            _fail('covarianceType')
+        if covarianceMatrix.min() < 0 or covarianceMatrix.max() > 1:
+            _fail('covarianceRange')
+        self.covarianceMatrix = _readOnly(covarianceMatrix)
+
         if shipDelayOption == 'Uniform':
-            if shipDelayValue > historyTime + 1:
-                message = "Must have more historical time periods than shipping delay value"
-                logging.error(message)
-                raise Exception(message)
-            if not isinstance(shipDelayValue, int):
-                message = "Shipping delay value must be an int"
-                logging.error(message)
-                raise Exception(message)
+            if not isinstance(shipDelayValue, _INT_TYPES):
+                _fail('shipDelayType')
             if shipDelayValue < 0:
-                message = "Shipping delay values cannot be less than 0"
-                logging.error(message)
-                raise Exception(message)
-            self.shipDelayList = [shipDelayValue, shipDelayValue, shipDelayValue, shipDelayValue, shipDelayValue]
-            logging.info(f"Set shipDelayList to {self.shipDelayList}")
+                _fail('shipDelayNegative')
+            self.shipDelayValue = int(shipDelayValue)
+            self.shipDelayList = _uniformTuple(self.shipDelayValue, self.numAgents)
         elif shipDelayOption == 'Varied':
             if shipDelayList is None:
-                message = "shipDelayList must be specified if shipDelayOption=Varied is chosen"
-                logging.error(message)
-                raise Exception(message)
-            if len(shipDelayList) != self.numAgents:
-                message = "A ship delay value must be input for each firm"
-                logging.error(message)
-                raise Exception(message)
-            if max(shipDelayList) > historyTime:
-                message = "Must have more historical time periods than maximum shipping delay value"
-                logging.error(message)
-                raise Exception(message)
-            for value in shipDelayList:
-                if not isinstance(value, int):
-                    message = "All shipping delay values must be int"
-                    logging.error(message)
-                    raise Exception(message)
-                if value < 0:
-                    message = "Shipping delay values cannot be less than 0"
-                    logging.error(message)
-                    raise Exception(message)
+                _fail('shipDelayListMissing')
+            delays = np.asarray(shipDelayList)
+            if delays.shape != (self.numAgents,):
+                _fail('shipDelayListLength')
+            if delays.dtype.kind not in 'iu':
+                _fail('shipDelayListType')
+            if delays.min() < 0:
+                _fail('shipDelayNegative')
+            self.shipDelayList = tuple(delays.tolist())
         else:
-            message = "Unknown option chosen for shipDelayOption"
-            logging.error(message)
-            raise Exception(message)
-
-        if shocks is None:
-            if runTime < 500:
-                message = "Default runtime not chosen, therefore default shocks cannot be chosen"
-                logging.error(message)
-                raise Exception(message)
-            shocks = np.array([[50, 1], [250, -.8]])
-        self.shocks = shocks
-        logging.info(f"Set shocks to {self.shocks}")
-        if not isinstance(shocks, np.ndarray):
-            message = "Shocks must be an NumpPy array"
-            logging.error(message)
-            raise Exception(message)
-        for time, value in self.shocks:
-            if time > runTime:
-                message = "Cannot have shock value after simulation ends"
-                logging.error(message)
-                raise Exception(message)
-            if time < 0:
-                message = "Cannot have shock value in time period before 0"
-                logging.error(message)
-                raise Exception(message)
-        rows, cols = shocks.shape
-        if rows > runTime:
-            message = "More shock periods than total time periods"
-            logging.error(message)
-            raise Exception(message)
+            _fail('shipDelayOption')
 
-        self.smoothingValue = smoothingValue
-        logging.info(f"Set smoothingValue to {self.smoothingValue}")
-        if not isinstance(smoothingValue, int):
-            message = "Smoothing value must be an int"
-            logging.error(message)
-            raise TypeError(message)
-        if smoothingValue < 1:
-            message = "Smoothing value cannot be less than 1"
-            logging.error(message)
-            raise Exception(message)
+        if not isinstance(shocks, np.ndarray):
+            _fail('shocksType')
+        shockTimes = shocks[:, 0]
+        if shockTimes.size and shockTimes.min() < 0:
+            _fail('shockBeforeStart')
+        self.shocks = _readOnly(shocks)
+
+        if len(wholesalerProfile) != 2:
+            _fail('wholesalerProfileLength')
+        profile1, profile2 = wholesalerProfile
+        if not math.isclose(profile1 + profile2, 1.0, abs_tol=1e-9):
+            _fail('wholesalerProfileSum')
+        self.wholesalerProfile = (profile1, profile2)  # Allocation of orders for wholesaler
+
+        # Phase 3: checks between parameters
+        if self.numTimePeriodsForCalc > self.historyTime:
+            _fail('calcPeriodsExceedHistory')
+        if shipDelayOption == 'Uniform' and self.shipDelayValue > self.historyTime + 1:
+            _fail('shipDelayExceedsHistory')
+        if shipDelayOption == 'Varied' and max(self.shipDelayList) > self.historyTime:
+            _fail('shipDelayListExceedsHistory')
+        if defaultShocks and self.runTime < 500:
+            _fail('defaultShocksRunTime')
+        if shockTimes.size and shockTimes.max() > self.runTime:
+            _fail('shockAfterEnd')
+        if len(self.shocks) > self.runTime:
+            _fail('tooManyShocks')
+
+        # Configs objects are shared between experiments by build(), so they cannot change once validated
+        self._frozen = True
+        logging.info("Configs initialized: %r", self)
 
-        self.wholesalerProfileOption = wholesalerProfileOption  # Options are optimization or default (no optimization)
-        logging.info(f"Set wholesalerProfileOption to {self.wholesalerProfileOption}")
-        if wholesalerProfile is None:
-            wholesalerProfile = [0.5, 0.5]
-        self.wholesalerProfile = wholesalerProfile  # Allocation of orders for wholesaler
-        logging.info(f"Set wholesalerProfile to {self.wholesalerProfile}")
-        if len(self.wholesalerProfile) != 2:
-            message = "Length of wholesaler profile must be 2"
-            logging.error(message)
-            raise Exception(message)
-        if sum(self.wholesalerProfile) != 1:
-            message = "Sum of wholesaler profile must equal 1"
-            logging.error(message)
-            raise Exception(message)
-        
-        self.cost_per_acre = 6975           # USD per acre of lettuce farming
-        self.cpm_us = 1.24                    # USD cost per mile in the US
-        self.cpm_mexico = 1.03                # USD cost per mile in Mexico
-        self.emission_per_acre = 4107         # lbs CO2 per acre. (right now this number is made up)
-        self.emission_per_mile = 3.742       # lbs CO2 per mile
-        self.water_per_acre = 652000          # gallons per acre annually. (this needs to be adjusted to account per truck somehow)
-        self.kwh_per_pallet_per_day = 0.914
-        self.pallet_weight_lb = 1540
-        logging.info("Set fixed cost/environment variables: cost_per_acre=5000, cpm_us=0.6, cpm_mexico=0.4, emission_per_acre=30, emission_per_mile=0.12, water_per_acre=1500")
     # def resetDefault(self):
     #     """
     #     Resets the configurations to their default values
@@ -471,11 +481,104 @@ class Configs(Mapping):
     # def experimentName(self):
     #    return f"{self.}"
 
+    @classmethod
+    def build(cls, **kwargs):
+        """
+        Creates a Configs object from the keyword arguments. Validating a Configs object is done once per unique set
+        of arguments; repeated calls with the same arguments return the (frozen) object validated on the first call.
+
+        :param kwargs:
+            Any keyword arguments accepted by Configs()
+
+        :return:
+            A validated Configs object
+        """
+        key = cls._cacheKey(kwargs)
+        cached = _cache.get(key)
+        if cached is None:
+            cached = cls(**kwargs)
+            _cache[key] = cached
+            if len(_cache) > _CACHE_SIZE:
+                _cache.popitem(last=False)  # Evict the least recently used object
+        else:
+            _cache.move_to_end(key)
+        return cached
+
+    @staticmethod
+    def _cacheKey(kwargs):
+        """
+        Creates a digest of the keyword arguments passed to build(). Arrays are hashed by shape, dtype and contents.
+
+        :param dict kwargs:
+            The keyword arguments passed to build()
+
+        :return:
+            bytes digest of the arguments
+        """
+        digest = hashlib.blake2b()
+        for name in sorted(kwargs):
+            value = kwargs[name]
+            if isinstance(value, np.ndarray):
+                digest.update(f"{name}={value.shape}{value.dtype.str};".encode())
+                digest.update(value.tobytes())
+            else:
+                digest.update(f"{name}={value!r};".encode())
+        return digest.digest()
+
+    @staticmethod
+    def _validateScalar(attribute, value, lowest, highest):
+        """
+        Checks that an integer parameter is an int (or NumPy integer) within [lowest, highest] and raises the matching
+        error if not. __init__ only calls this once its inline check of a _SCHEMA row has failed.
+
+        :param str attribute:
+            Name of the parameter being checked
+        :param value:
+            The parameter value to check
+        :param int lowest:
+            Lowest allowed value
+        :param highest:
+            Highest allowed value (math.inf if there is no upper bound)
+
+        :return:
+            None
+        """
+        if not isinstance(value, _INT_TYPES):
+            _fail(f'{attribute}Type', TypeError)
+        if not lowest <= value <= highest:
+            _fail(f'{attribute}Range')
+
+    def __repr__(self):
+        values = []
+        for field in self:
+            value = getattr(self, field)
+            if isinstance(value, np.ndarray):
+                # Summarize large arrays (e.g. long shock tables) instead of writing every row
+                value = np.array2string(value, threshold=8, precision=3, separator=', ')
+            else:
+                value = repr(value)
+            values.append(f"{field}={value}")
+        return f"Configs({', '.join(values)})"
+
+    def __setattr__(self, key, value):
+        if getattr(self, '_frozen', False):
+            message = f"Configs is frozen: cannot set {key}"
+            logging.error(message)
+            raise AttributeError(message)
+        object.__setattr__(self, key, value)
+
+    def __delattr__(self, key):
+        message = f"Configs is frozen: cannot delete {key}"
+        logging.error(message)
+        raise AttributeError(message)
+
     def __getitem__(self, item):
-        return self.__dict__[item]
+        if item not in self._FIELDS or not hasattr(self, item):
+            raise KeyError(item)
+        return getattr(self, item)
 
     def __iter__(self):
-        return iter(self.__dict__)
+        return (field for field in self._FIELDS if hasattr(self, field))
 
     def __len__(self):
-        return len(self.__dict__)
\ No newline at end of file
+        return sum(1 for _ in self)
\ No newline at end of file
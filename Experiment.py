@@ -1,19 +1,62 @@
 
 import logging
-from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import itertools
+import os
+import random
+import zipfile
 import numpy as np
 from datetime import datetime
-import matplotlib.pyplot as plt
 
 
 from Configs import Configs
 from Simulation import Simulation
-import Firm
 import ExperimentData
 
 
-class Experiment(Mapping):
+def _initializeWorker(configs, firmList):
+    """
+    Initializer for the worker processes used by Experiment.run. Sets up the Simulation class in the worker the same way
+    Experiment.setup does in the parent process, so the configuration and firms are sent once per worker instead of once
+    per simulation.
+
+    :param Configs configs:
+        The experiment's configuration
+    :param list firmList:
+        The firms created by Experiment.setup
+
+    :return:
+        None
+    """
+    Simulation.initializeClass(configs, firmList)
+
+
+def _runSimulation(simNo, seedSequence):
+    """
+    Runs one simulation of an experiment and resets the firms afterwards. Runs in a worker process, or in the parent
+    process when the experiment uses a single worker.
+
+    :param int simNo:
+        The simulation number within the experiment
+    :param np.random.SeedSequence seedSequence:
+        Seeds the random draws made during the simulation. Demand is drawn from a generator seeded with it, and
+        production queues are shuffled with a random.Random seeded from an independent child sequence spawned from it.
+        The random module's global state is left alone
+
+    :return:
+        np.ndarray of shape (6, numAgents, totalTime) that Simulation.processData wrote the six data arrays into
+    """
+    shuffleSeed = seedSequence.spawn(1)[0]
+    sim = Simulation(seedSequence, shuffleRandom=random.Random(int(shuffleSeed.generate_state(1)[0])))
+    sim.initializeSim(testOption=False)
+    sim.runSimulation()
+    data = np.empty((len(Simulation.dataOptions), Simulation.numAgents, Simulation.totalTime))
+    sim.processData(simNo, out=data)
+    sim.resetFirms()
+    return data
+
+
+class Experiment:
     """
     A class which handles the parameters and data output from the simulations.
 
@@ -34,14 +77,26 @@ class Experiment(Mapping):
 
     Instance Attributes
     -------------------
+    compressCsv: bool
+        Optional argument. If True, the CSV is written gzip-compressed as .csv.gz. Defaults to False.
+    dataFormat: str
+        Optional argument. Takes the values 'CSV' (default), 'NPZ', or 'Both'. Selects how the averaged data is saved:
+        as a .csv table, as a compressed binary .npz archive (much faster to write and smaller), or both.
     experimentConfigs: Configs.Configs
         A Configs object which stores all the parameters used for the experiment.
     firmList: List
         A list of Firm3 objects representing the firms in the simulation.
     id: int
         Unique identifier for the experiment
+    numWorkers: int
+        Optional argument. The number of processes the simulations are run in. Defaults to 1, which runs the
+        simulations one after another in the current process; larger values start a process pool (os.cpu_count() is a
+        sensible choice for long experiments).
     savePath: str
         A string representing the local place where the packaged experiment data will be saved to.
+    seed: int
+        Optional argument. Seeds the random draws of every simulation so an experiment can be repeated exactly. The
+        results do not depend on numWorkers. If None, a fresh seed is used.
     startingExperimentNumber: int
         Optional argument. If prior experiments have been performed, the id will begin with this value and increment
         from there.
@@ -55,7 +110,11 @@ class Experiment(Mapping):
     def __init__(self,
                  savePath,
                  experimentConfigs,
-                 startingExperimentNumber=1):
+                 startingExperimentNumber=1,
+                 numWorkers=1,
+                 seed=None,
+                 dataFormat="CSV",
+                 compressCsv=False):
         self.id = next(self.idIter) + startingExperimentNumber  # The experiment number
 
         self.experimentConfigs = experimentConfigs
@@ -70,6 +129,30 @@ class Experiment(Mapping):
             logging.error(message)
             raise TypeError(message)
 
+        self.numWorkers = numWorkers
+        if not isinstance(self.numWorkers, int):
+            message = f"Experiment: {self.id}, non-int input into numWorkers"
+            logging.error(message)
+            raise TypeError(message)
+        if self.numWorkers < 1:
+            message = f"Experiment: {self.id}, numWorkers must be 1 or greater"
+            logging.error(message)
+            raise Exception(message)
+
+        self.seed = seed
+
+        self.dataFormat = dataFormat
+        if self.dataFormat not in ("CSV", "NPZ", "Both"):
+            message = f"Experiment: {self.id}, dataFormat must be 'CSV', 'NPZ', or 'Both'"
+            logging.error(message)
+            raise Exception(message)
+
+        self.compressCsv = compressCsv
+        if not isinstance(self.compressCsv, bool):
+            message = f"Experiment: {self.id}, non-bool input into compressCsv"
+            logging.error(message)
+            raise TypeError(message)
+
         self.firmList = []
 
         self.experimentData = ExperimentData.ExperimentData(self.experimentConfigs.numAgents,
@@ -81,17 +164,6 @@ class Experiment(Mapping):
 
         self.now = datetime.now().strftime("%Y_%m_%d_%H_%M_%S")
 
-    def __getitem__(self, item):
-        return self.__dict__[item]
-
-    # Iterate through each simulation?
-    def __iter__(self):
-        return iter(self.__dict__)
-
-    # Define the length of "Experiment" as the number of simulations (n)?
-    def __len__(self):
-        return len(self.__dict__)
-
     def createCharts(self):
         """
         After the simulations have run, the method will then create the charts
@@ -104,94 +176,46 @@ class Experiment(Mapping):
                                               self.experimentConfigs.historyTime,
                                               self.experimentConfigs.wholesalerProfileOption,
                                               self.now)
+        self.plotTotals()
 
     def packageData(self):
         """
-        Will package together the .csv, .txt, .log, and .png files for exporting:
+        Will package together the .csv/.npz, .txt, .log, and .png files for exporting:
             1. A .txt file that contains the parameters for the experiment (related to Configs.Configs)
-            2. A .csv file that contains the raw data for the experiment (related to ExperimentData)
+            2. A .csv and/or .npz file that contains the raw data for the experiment (related to ExperimentData)
             3. A .png file(s) that contain(s) the output charts (related to ExperimentChart)
             4. A .log file that contains the logging information for all n simulations
 
+        All files are written into one zip archive in the save folder. Files that do not exist (e.g. no log file was
+        configured) are skipped.
+
         :return:
+            str, the path of the zip archive
         """
-        pass
+        saveFolder = self.experimentData.saveFolder
+        baseName = f"Experiment_{self.id}_{self.now}"
+        artifacts = [os.path.join(saveFolder, baseName + extension) for extension in (".txt", ".csv", ".csv.gz", ".npz", ".png")]
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, logging.FileHandler):
+                handler.flush()
+                artifacts.append(handler.baseFilename)
+
+        # One archive writer for every file; compresslevel 1 keeps the CPU cost of packaging low
+        zipName = os.path.join(saveFolder, baseName + ".zip")
+        with zipfile.ZipFile(zipName, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zipFile:
+            for path in artifacts:
+                if os.path.isfile(path):
+                    zipFile.write(path, arcname=os.path.basename(path))
+        return zipName
+
+    def plotTotals(self):
+        """
+        Plots the total money, CO2, water, and electricity costs across the whole supply chain, summed over every firm
+        and time period of the averaged data
 
-    def run(self):
-        demandAccumulator     = np.zeros((self.experimentConfigs.numAgents,
-                                          self.experimentConfigs.historyTime + self.experimentConfigs.runTime))
-        costMoneyAccumulator  = np.zeros((self.experimentConfigs.numAgents,
-                                          self.experimentConfigs.historyTime + self.experimentConfigs.runTime))
-        costCO2Accumulator    = np.zeros((self.experimentConfigs.numAgents,
-                                          self.experimentConfigs.historyTime + self.experimentConfigs.runTime))
-        costWaterAccumulator  = np.zeros((self.experimentConfigs.numAgents,
-                                          self.experimentConfigs.historyTime + self.experimentConfigs.runTime))
-
-        backlogAccumulator   = np.zeros((self.experimentConfigs.numAgents,
-                                          self.experimentConfigs.historyTime + self.experimentConfigs.runTime))
-        electricityAccumulator = np.zeros(
-            (self.experimentConfigs.numAgents,
-            self.experimentConfigs.historyTime + self.experimentConfigs.runTime),
-            dtype=float
-        )
-
-        for i in range(self.experimentConfigs.numIterations):
-            sim = Simulation()
-            sim.initializeSim(testOption=False)
-            sim.runSimulation()
-
-            demandData, costMoneyData, costCO2Data, costWaterData, backlogData, electricityData  = sim.processData(i)
-
-            demandAccumulator    += demandData
-            costMoneyAccumulator += costMoneyData
-            costCO2Accumulator   += costCO2Data
-            costWaterAccumulator += costWaterData
-            electricityAccumulator += electricityData
-
-            # ACCUMULATE backlogs into backlogAccumulator
-            backlogAccumulator   += backlogData
-
-            message = f"Experiment {self.id} Sim {i} running..."
-            print(message)
-            sim.resetFirms()
-
-        # Now average everything
-        self.experimentData.averageData      = demandAccumulator    / self.experimentConfigs.numIterations
-        self.experimentData.averageCostMoney = costMoneyAccumulator / self.experimentConfigs.numIterations
-        self.experimentData.averageCostCO2   = costCO2Accumulator   / self.experimentConfigs.numIterations
-        self.experimentData.averageCostWater = costWaterAccumulator / self.experimentConfigs.numIterations
-        self.experimentData.averageElectricity = electricityAccumulator / self.experimentConfigs.numIterations
-
-        # *** Set average backlog ***
-        self.experimentData.averageBacklog   = backlogAccumulator   / self.experimentConfigs.numIterations
-
-        self.createCharts()
-        self.experimentData.writeCsvData(self.experimentConfigs.historyTime + self.experimentConfigs.runTime,
-                                         self.experimentConfigs.historyTime,
-                                         self.now)
-        self.writeTxtData()
-
-
-
-            # data = sim.processData(i)
-            # data = np.array(data)
-            # self.experimentData.averageData = np.add(self.experimentData.averageData, data)
-
-
-        message = f"Experiment {self.id} Sim {i} running..."
-        print(message)
-        sim.resetFirms()
-        self.experimentData.averageData = demandAccumulator / self.experimentConfigs.numIterations
-        self.experimentData.averageCostMoney = costMoneyAccumulator / self.experimentConfigs.numIterations
-        self.experimentData.averageCostCO2   = costCO2Accumulator / self.experimentConfigs.numIterations
-        self.experimentData.averageCostWater = costWaterAccumulator / self.experimentConfigs.numIterations
-        self.experimentData.averageElectricity = electricityAccumulator / self.experimentConfigs.numIterations
-
-        self.createCharts()
-        self.experimentData.writeCsvData(self.experimentConfigs.historyTime + self.experimentConfigs.runTime,
-                                         self.experimentConfigs.historyTime,
-                                         self.now)
-        self.writeTxtData()
+        :return:
+        """
+        import matplotlib.pyplot as plt  # Imported here so worker processes, which never plot, do not load pyplot
 
         data = self.experimentData
         total_money = np.sum(data.averageCostMoney)
@@ -202,14 +226,14 @@ class Experiment(Mapping):
         categories = ['Money ($)', 'CO₂ (lbs)', 'Water (gal)', 'Electricity (kWh)']
         values     = [total_money, total_co2, total_water, total_electricity]
 
-        plt.figure(figsize=(6,4))
-        bars = plt.bar(categories, values, edgecolor='black')
-        plt.ylabel('Total Cost Across Supply Chain')
-        plt.title('Overall Aggregated Costs')
+        fig, ax = plt.subplots(figsize=(6,4))
+        bars = ax.bar(categories, values, edgecolor='black')
+        ax.set_ylabel('Total Cost Across Supply Chain')
+        ax.set_title('Overall Aggregated Costs')
 
         for bar in bars:
             h = bar.get_height()
-            plt.text(
+            ax.text(
                 bar.get_x() + bar.get_width()/2,
                 h + 0.02 * max(values),
                 f"{h:,.0f}",
@@ -217,9 +241,68 @@ class Experiment(Mapping):
                 va='bottom'
             )
 
-        plt.tight_layout()
-        plt.show()
+        fig.tight_layout()
+        if not ExperimentData.HEADLESS:
+            plt.show()
+        plt.close(fig)
 
+    def run(self):
+        configs = self.experimentConfigs
+        numAgents = configs.numAgents
+        historyTime = configs.historyTime
+        totalTime = historyTime + configs.runTime
+        numIterations = configs.numIterations
+
+        # One accumulator for all six data arrays returned by Simulation.processData, in the same order:
+        # demand, money cost, CO2 cost, water cost, backlog, electricity. It is left uninitialized, since the first
+        # simulation's data is copied into it rather than added to zeros
+        accumulator = np.empty((6, numAgents, totalTime))
+
+        # Every simulation gets its own independent random stream, so the results do not depend on which process runs it
+        seeds = np.random.SeedSequence(self.seed).spawn(numIterations)
+        numWorkers = min(self.numWorkers, numIterations)
+        executor = None
+        if numWorkers > 1:
+            executor = ProcessPoolExecutor(max_workers=numWorkers,
+                                           initializer=_initializeWorker,
+                                           initargs=(configs, self.firmList))
+            results = executor.map(_runSimulation,
+                                   range(numIterations),
+                                   seeds,
+                                   chunksize=max(1, numIterations // (4 * numWorkers)))
+        else:
+            results = map(_runSimulation, range(numIterations), seeds)
+
+        try:
+            for i, simData in enumerate(results):
+                if i == 0:
+                    np.copyto(accumulator, simData)
+                else:
+                    # Explicit out= keeps the add in place at the accumulator's dtype, whatever dtype simData has
+                    np.add(accumulator, simData, out=accumulator, casting='unsafe')
+
+                message = f"Experiment {self.id} Sim {i} finished"
+                print(message)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        # Now average everything, straight into ExperimentData's metrics tensor
+        np.divide(accumulator, numIterations, out=self.experimentData.metrics)
+
+        # The data files are written on background threads while the charts are drawn on this one (matplotlib is not
+        # thread-safe). Writing releases the GIL for disk I/O and compression, so the two overlap
+        with ThreadPoolExecutor(max_workers=3) as writer:
+            writes = []
+            if self.dataFormat != "NPZ":
+                writes.append(writer.submit(self.experimentData.writeCsvData, totalTime, historyTime, self.now,
+                                            compress=self.compressCsv))
+            if self.dataFormat != "CSV":
+                writes.append(writer.submit(self.experimentData.writeBinaryData, totalTime, historyTime, self.now))
+            writes.append(writer.submit(self.writeTxtData))
+            self.createCharts()
+            for write in writes:
+                write.result()  # Re-raises any error from the write
 
     def savePackagedData(self):
         """
@@ -244,47 +327,51 @@ class Experiment(Mapping):
             :return:
                 List of Firm3 objects
             """
-            f0 = Firm.Retailer(alpha=self.experimentConfigs.alphaValueList[0],
-                                runTime=self.experimentConfigs.runTime,
-                                historyTime=self.experimentConfigs.historyTime,
-                                shipDelay=self.experimentConfigs.shipDelayList[0],
-                                idNum=0,
-                                supplierList=[1],
-                                customerList=[-99])
-            f1 = Firm.Wholesaler(alpha=self.experimentConfigs.alphaValueList[1],
-                                  runTime=self.experimentConfigs.runTime,
-                                  historyTime=self.experimentConfigs.historyTime,
-                                  shipDelay=self.experimentConfigs.shipDelayList[1],
-                                  idNum=1,
-                                  supplierList=[2, 3],
-                                  customerList=[0],
-                                  wholesalerProfile=self.experimentConfigs.wholesalerProfile,
-                                  wholesalerProfileOption=self.experimentConfigs.wholesalerProfileOption,
-                                  numTimePeriodsForCalc=self.experimentConfigs.numTimePeriodsForCalc,
-                                  historicalReturnRuleOption=self.experimentConfigs.historicalReturnRuleOption,
-                                  covarianceMatrix=self.experimentConfigs.covarianceMatrix,
-                                  riskTolerance=self.experimentConfigs.riskTolerance)
-            f2 = Firm.Manufacturer(alpha=self.experimentConfigs.alphaValueList[2],
-                                    runTime=self.experimentConfigs.runTime,
-                                    historyTime=self.experimentConfigs.historyTime,
-                                    shipDelay=self.experimentConfigs.shipDelayList[2],
-                                    idNum=2,
-                                    supplierList=[4],
-                                    customerList=[1])
-            f3 = Firm.Manufacturer(alpha=self.experimentConfigs.alphaValueList[3],
-                                    runTime=self.experimentConfigs.runTime,
-                                    historyTime=self.experimentConfigs.historyTime,
-                                    shipDelay=self.experimentConfigs.shipDelayList[3],
-                                    idNum=3,
-                                    supplierList=[4],
-                                    customerList=[1])
-            f4 = Firm.RawMaterials(alpha=self.experimentConfigs.alphaValueList[4],
-                                    runTime=self.experimentConfigs.runTime,
-                                    historyTime=self.experimentConfigs.historyTime,
-                                    shipDelay=self.experimentConfigs.shipDelayList[4],
-                                    idNum=4,
-                                    supplierList=[-99],
-                                    customerList=[2, 3])
+            import Firm  # Only the parent process builds firms; workers receive them through _initializeWorker
+
+            configs = self.experimentConfigs
+            alphaValueList = configs.alphaValueList
+            shipDelayList = configs.shipDelayList
+            # Keyword arguments shared by every firm
+            common = dict(runTime=configs.runTime,
+                          historyTime=configs.historyTime)
+
+            f0 = Firm.Retailer(alpha=alphaValueList[0],
+                               shipDelay=shipDelayList[0],
+                               idNum=0,
+                               supplierList=[1],
+                               customerList=[-99],
+                               **common)
+            f1 = Firm.Wholesaler(alpha=alphaValueList[1],
+                                 shipDelay=shipDelayList[1],
+                                 idNum=1,
+                                 supplierList=[2, 3],
+                                 customerList=[0],
+                                 wholesalerProfile=configs.wholesalerProfile,
+                                 wholesalerProfileOption=configs.wholesalerProfileOption,
+                                 numTimePeriodsForCalc=configs.numTimePeriodsForCalc,
+                                 historicalReturnRuleOption=configs.historicalReturnRuleOption,
+                                 covarianceMatrix=configs.covarianceMatrix,
+                                 riskTolerance=configs.riskTolerance,
+                                 **common)
+            f2 = Firm.Manufacturer(alpha=alphaValueList[2],
+                                   shipDelay=shipDelayList[2],
+                                   idNum=2,
+                                   supplierList=[4],
+                                   customerList=[1],
+                                   **common)
+            f3 = Firm.Manufacturer(alpha=alphaValueList[3],
+                                   shipDelay=shipDelayList[3],
+                                   idNum=3,
+                                   supplierList=[4],
+                                   customerList=[1],
+                                   **common)
+            f4 = Firm.RawMaterials(alpha=alphaValueList[4],
+                                   shipDelay=shipDelayList[4],
+                                   idNum=4,
+                                   supplierList=[-99],
+                                   customerList=[2, 3],
+                                   **common)
             firmList = [f0, f1, f2, f3, f4]
             return firmList
 
@@ -294,27 +381,31 @@ class Experiment(Mapping):
 
     def writeTxtData(self):
         """
-
+        Writes the experiment's parameters to Experiment_<id>_<now>.txt in the save folder
 
         :return:
         """
+        configs = self.experimentConfigs
+        # Arrays are written in full, however many rows they have
+        shocks = np.array2string(configs.shocks, threshold=np.inf)
+        covarianceMatrix = np.array2string(configs.covarianceMatrix, threshold=np.inf)
+        # Configs stores the per-firm values and the wholesaler profile as tuples; they are written as lists, as they
+        # always have been
         lines = [f"Experiment_{self.id}",
-                 f"runTime= {self.experimentConfigs.runTime}",
-                 f"historyTime= {self.experimentConfigs.historyTime}",
-                 f"numIterations= {self.experimentConfigs.numIterations}",
-                 f"alphaValueList= {self.experimentConfigs.alphaValueList}",
-                 f"demandMu= {self.experimentConfigs.demandMu}",
-                 f"demandStd= {self.experimentConfigs.demandStd}",
-                 f"shipDelayList= {self.experimentConfigs.shipDelayList}",
-                 f"shocks=\n {self.experimentConfigs.shocks}",
-                 f"smoothingValue= {self.experimentConfigs.smoothingValue}",
-                 f"wholesalerProfile= {self.experimentConfigs.wholesalerProfile}",
-                 f"covarianceMatrix=\n {self.experimentConfigs.covarianceMatrix}",
-                 f"historicalReturnRuleOption= {self.experimentConfigs.historicalReturnRuleOption}",
-                 f"numTimePeriodsForCalc= {self.experimentConfigs.numTimePeriodsForCalc}",
-                 f"riskTolerance= {self.experimentConfigs.riskTolerance}"]
-        fileName = f"Experiment_{self.id}_{self.now}.txt"
+                 f"runTime= {configs.runTime}",
+                 f"historyTime= {configs.historyTime}",
+                 f"numIterations= {configs.numIterations}",
+                 f"alphaValueList= {list(configs.alphaValueList)}",
+                 f"demandMu= {configs.demandMu}",
+                 f"demandStd= {configs.demandStd}",
+                 f"shipDelayList= {list(configs.shipDelayList)}",
+                 f"shocks=\n {shocks}",
+                 f"smoothingValue= {configs.smoothingValue}",
+                 f"wholesalerProfile= {list(configs.wholesalerProfile)}",
+                 f"covarianceMatrix=\n {covarianceMatrix}",
+                 f"historicalReturnRuleOption= {configs.historicalReturnRuleOption}",
+                 f"numTimePeriodsForCalc= {configs.numTimePeriodsForCalc}",
+                 f"riskTolerance= {configs.riskTolerance}"]
+        fileName = os.path.join(self.experimentData.saveFolder, f"Experiment_{self.id}_{self.now}.txt")
         with open(fileName, 'w') as f:
-            for line in lines:
-                f.write(line)
-                f.write("\n")
+            f.write("\n".join(lines) + "\n")
@@ -1,18 +1,45 @@
-
-# Mapping implements __getitem__, which allows for indexing experimentCharts[2] would grab the second chart, for example
-from collections.abc import Mapping
+import gzip
+import io
 import numpy as np
-import matplotlib.pyplot as plt
-import csv
+import matplotlib
 from datetime import datetime
 
 import os
+# Set BUTTER_LETTUCE_HEADLESS=1 for batch runs: charts are still saved, but rendered off-screen and never shown
+HEADLESS = os.environ.get("BUTTER_LETTUCE_HEADLESS", "0") not in ("", "0")
+if HEADLESS:
+    matplotlib.use('Agg')
+# Resolution the charts are saved at. 72 dpi is plenty for a PNG and rasterizes about half the pixels of the default
+CHART_DPI = 72
+# Roughly how many values writeCsvData formats at once. Bounds the memory of the boxed table savetxt works on
+CSV_CHUNK_VALUES = 1 << 20
+# Names of the six metrics, in the order they are stored in ExperimentData.metrics. Used in the CSV row labels
+METRICS = ("Demand", "CostMoney", "CostCO2", "CostWater", "Backlog", "CostElectricity")
+
 # Find the root directory to save the path for the chart
 abspath = os.path.abspath(__file__)
 rootDir = os.path.dirname(abspath)
 
 
-class ExperimentData(Mapping):
+def _metricView(index):
+    """
+    Creates a property exposing one entry of ExperimentData.metrics as a (numAgents, totalTime) view. Assigning to the
+    property copies the values into metrics.
+
+    :param int index:
+        The position of the metric in ExperimentData.metrics
+    :return: property
+    """
+    def getView(self):
+        return self.metrics[index]
+
+    def setView(self, value):
+        self.metrics[index] = value
+
+    return property(getView, setView)
+
+
+class ExperimentData:
     """
     A class which handles data storage, processing, analysis. and presentation for the simulation.
 
@@ -23,6 +50,14 @@ class ExperimentData(Mapping):
 
     Instance Attributes
     -------------------
+    metrics: ndArray
+        (6, numAgents, totalTime) float64 array holding the averaged demand, money cost, CO2 cost, water cost, backlog,
+        and electricity data. averageData, averageCostMoney, averageCostCO2, averageCostWater, averageBacklog, and
+        averageElectricity are (numAgents, totalTime) views of its six entries; assigning to them copies into metrics.
+        These six names are also the keys of the object's mapping interface (data['averageBacklog'], dict(data)).
+        Allocated (as zeros) on first access, so experiments that are created but not yet run hold no data memory.
+    saveFolder: str
+        Absolute path of the folder the experiment's output files are written to (rootDir/savePath)
 
 
     Instance Methods
@@ -30,6 +65,17 @@ class ExperimentData(Mapping):
 
     """
 
+    averageData = _metricView(0)
+    averageCostMoney = _metricView(1)
+    averageCostCO2 = _metricView(2)
+    averageCostWater = _metricView(3)
+    averageBacklog = _metricView(4)
+    averageElectricity = _metricView(5)
+
+    # The keys of the mapping interface: only the averaged data arrays, in the order they are stored in metrics
+    _KEYS = ('averageData', 'averageCostMoney', 'averageCostCO2', 'averageCostWater', 'averageBacklog',
+             'averageElectricity')
+
     def __init__(self,
                  numAgents,
                  totalTime,
@@ -39,124 +85,149 @@ class ExperimentData(Mapping):
         self.totalTime = totalTime
         self.experimentNumber = experimentNumber
 
-        self.averageData = np.zeros((self.numAgents,
-                                     self.totalTime), dtype=int)
-        
-        self.averageCostMoney = np.zeros((self.numAgents, self.totalTime), dtype=float)
-        self.averageCostCO2   = np.zeros((self.numAgents, self.totalTime), dtype=float)
-        self.averageCostWater = np.zeros((self.numAgents, self.totalTime), dtype=float)
-        self.averageBacklog = np.zeros((self.numAgents, self.totalTime), dtype=int)
-        self.averageElectricity = np.zeros((self.numAgents, self.totalTime), dtype=float)
-
+        # All six metrics live in one (6, numAgents, totalTime) tensor, in the order demand, money cost, CO2 cost, water
+        # cost, backlog, electricity. averageData etc. are views into it. It is allocated on first use, see metrics
+        self._metrics = None
+        # CSV row labels, one per row of metrics viewed as a (6 * numAgents, totalTime) table
+        self._rowLabels = [f"Firm {i} {metric}" for metric in METRICS for i in range(self.numAgents)]
 
+        # Output files are written to rootDir/savePath by absolute path, so the working directory is left alone
+        self.saveFolder = os.path.join(rootDir, savePath)
+        os.makedirs(self.saveFolder, exist_ok=True)  # No exists() check, which races with concurrent experiments
 
-
-
-        saveFolder = os.path.join(rootDir, savePath)
-        if not os.path.exists(saveFolder):
-            os.makedirs(saveFolder)
-        os.chdir(saveFolder)  # Change the working directory to rootDir/savePath
+    @property
+    def metrics(self):
+        if self._metrics is None:
+            # Double precision, so large cost averages keep all their digits in the exported data
+            self._metrics = np.zeros((len(METRICS), self.numAgents, self.totalTime))
+        return self._metrics
 
     def __getitem__(self, item):
-        return self.__dict__[item]
+        if item not in self._KEYS:
+            raise KeyError(item)
+        return getattr(self, item)
 
     def __iter__(self):
-        return iter(self.__dict__)
+        return iter(self._KEYS)
 
     def __len__(self):
-        return len(self.__dict__)
+        return len(self._KEYS)
+
+    def keys(self):
+        return self._KEYS
 
-    def writeCsvData(self, totalTime, timeStart, now):
+    def writeCsvData(self, totalTime, timeStart, now, compress=False):
         """
         Write CSV: each row = [Label, val_t0, val_t1, ..., val_tN]
+
+        :param bool compress:
+            Optional argument. If True, the CSV is gzip-compressed (at level 1, which is fast and nearly as small as the
+            default level) and saved as .csv.gz
         """
 
         # Time header
-        xAxis = list(range(timeStart, totalTime))  # [t0, t1, ..., tN]
-        headerRow = ["Time"] + xAxis
-
-        # Data slices
-        demand = self.averageData[:, timeStart:totalTime]
-        costMoney = self.averageCostMoney[:, timeStart:totalTime]
-        costCO2 = self.averageCostCO2[:, timeStart:totalTime]
-        costWater = self.averageCostWater[:, timeStart:totalTime]
-        backlog = self.averageBacklog[:, timeStart:totalTime]
-        costelectricity = self.averageElectricity[:, timeStart:totalTime]
-
-
-        # Stack and label
-        dataRows = []
-        for i in range(self.numAgents):
-            dataRows.append([f"Firm {i} Demand"] + demand[i].tolist())
-        for i in range(self.numAgents):
-            dataRows.append([f"Firm {i} CostMoney"] + costMoney[i].tolist())
-        for i in range(self.numAgents):
-            dataRows.append([f"Firm {i} CostCO2"] + costCO2[i].tolist())
-        for i in range(self.numAgents):
-            dataRows.append([f"Firm {i} CostWater"] + costWater[i].tolist())
-        for i in range(self.numAgents):
-            dataRows.append([f"Firm {i} Backlog"] + backlog[i].tolist())
-        for i in range(self.numAgents):
-            dataRows.append([f"Firm {i} CostElectricity"] + costelectricity[i].tolist())
-
-
-        # Combine all
-        writtenData = [headerRow] + dataRows
-        fileName = f"Experiment_{self.experimentNumber}_{now}.csv"
-
-        # Save
-        with open(fileName, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerows(writtenData)
-
-
-
-class ExperimentCharts(Mapping):
+        xAxis = np.arange(timeStart, totalTime)  # [t0, t1, ..., tN]
+
+        # Stack and label. Viewed as one (6 * numAgents, totalTime) table, metrics needs no copy; the rows are boxed and
+        # formatted a block at a time so large runs never hold the whole table as Python objects. Boxed values are
+        # Python floats, so %s writes the shortest text that round-trips, as the csv module does
+        table = self.metrics.reshape(-1, self.totalTime)[:, timeStart:totalTime]
+        rowLabels = self._rowLabels
+        rowsPerChunk = max(1, CSV_CHUNK_VALUES // (len(xAxis) + 1))
+        chunk = np.empty((min(rowsPerChunk, len(table)), len(xAxis) + 1), dtype=object)
+        fileName = os.path.join(self.saveFolder, f"Experiment_{self.experimentNumber}_{now}.csv")
+
+        # Save. savetxt encodes the text itself, so the file is opened in binary mode with a large buffer and bypasses
+        # the text layer. The buffer also hands gzip large blocks rather than single rows. The \r\n line ending
+        # matches the csv module's default
+        if compress:
+            f = io.BufferedWriter(gzip.open(fileName + ".gz", 'wb', compresslevel=1), buffer_size=4 << 20)
+        else:
+            f = open(fileName, 'wb', buffering=4 << 20)
+        with f:
+            f.write(("Time," + ",".join(xAxis.astype(str)) + "\r\n").encode())
+            for start in range(0, len(table), rowsPerChunk):
+                rows = table[start:start + rowsPerChunk]
+                writtenData = chunk[:len(rows)]
+                writtenData[:, 0] = rowLabels[start:start + rowsPerChunk]
+                writtenData[:, 1:] = rows
+                np.savetxt(f, writtenData, fmt="%s", delimiter=",", newline="\r\n")
+
+    def writeBinaryData(self, totalTime, timeStart, now):
+        """
+        Write the same data as writeCsvData to a compressed .npz archive. Skips the float to text conversion, so it is
+        much faster to write and smaller than the CSV. Load it with np.load; the arrays are time (the time periods),
+        and demand, costMoney, costCO2, costWater, backlog, and costElectricity, each (numAgents, len(time)).
+
+        :param int totalTime:
+            The total number of time periods, including history time
+        :param int timeStart:
+            The first time period saved (the history time is left out)
+        :param str now:
+            Timestamp used in the file name
+        :return:
+        """
+        fileName = os.path.join(self.saveFolder, f"Experiment_{self.experimentNumber}_{now}.npz")
+        np.savez_compressed(fileName,
+                            time=np.arange(timeStart, totalTime),
+                            demand=self.averageData[:, timeStart:totalTime],
+                            costMoney=self.averageCostMoney[:, timeStart:totalTime],
+                            costCO2=self.averageCostCO2[:, timeStart:totalTime],
+                            costWater=self.averageCostWater[:, timeStart:totalTime],
+                            backlog=self.averageBacklog[:, timeStart:totalTime],
+                            costElectricity=self.averageElectricity[:, timeStart:totalTime])
+
+
+class ExperimentCharts:
     """
     Container for all the graphical representations of the simulation
+
+    Class Attributes
+    ----------------
+    demandFigure: matplotlib.figure.Figure
+        In headless mode, the figure the demand chart is drawn on. Created by the first chart and cleared and redrawn
+        by every later one, so a batch of experiments reuses one figure. None until then, and never set when charts
+        are shown interactively.
     """
+    demandFigure = None
 
     def __init__(self,
                  experimentData):
         self.experimentData = experimentData
         self.charts = []
 
-    # Indexing here could be meaningful, think carefully about how to do this.
-    def __getitem__(self, item):
-        return self.__dict__[item]
-
-    # Should iterate through the charts only
-    def __iter__(self):
-        return iter(self.__dict__)
-
-    # Should return the number of charts
-    def __len__(self):
-        return len(self.__dict__)
-
     def plotAverageData(self, numSims, totalTime, timeStart, optimized, now):
-        # Demand Data
-        plt.figure(1)
+        import matplotlib.pyplot as plt  # Imported here so processes that never plot do not load pyplot
+
+        # Demand Data. Headless runs redraw the same figure for every experiment; interactive runs get a new figure per
+        # chart, since the user closes the shown window
+        if HEADLESS and ExperimentCharts.demandFigure is not None:
+            fig = ExperimentCharts.demandFigure
+            ax = fig.axes[0]
+            ax.clear()
+        else:
+            fig, ax = plt.subplots()
         if optimized == 'Optimize':
             chartInfo = 'Optimized'
         else:
             chartInfo = "Baseline"
         chartTitle = f"{chartInfo} Demand Chart, averaged over {numSims} sims"
-        plt.title(chartTitle)
-        plt.xlabel('Time')
-        plt.ylabel('Demand')
-        xAxis = list(range(timeStart, totalTime))  # Time axis
-        for firm in range(len(self.experimentData.averageData)):
-            data = self.experimentData.averageData[firm, timeStart::]
-            label = f"Firm {firm}"
-            plt.plot(xAxis, data, label=label)
-        plt.legend()
-
-        def saveChart():
-            fileName = f"Experiment_{self.experimentData.experimentNumber}_{now}.png"
-            plt.savefig(fileName)
-
-        saveChart()
-        plt.show()
+        ax.set_title(chartTitle)
+        ax.set_xlabel('Time')
+        ax.set_ylabel('Demand')
+        xAxis = np.arange(timeStart, totalTime)  # Time axis
+        # One call draws every firm's line; each column of the transposed data is one firm
+        lines = ax.plot(xAxis, self.experimentData.averageData[:, timeStart::].T)
+        ax.legend(lines, [f"Firm {firm}" for firm in range(len(lines))])
+
+        fileName = os.path.join(self.experimentData.saveFolder,
+                                f"Experiment_{self.experimentData.experimentNumber}_{now}.png")
+        fig.savefig(fileName, dpi=CHART_DPI)
+        if HEADLESS:
+            ExperimentCharts.demandFigure = fig  # Kept for the next experiment's chart
+        else:
+            plt.show()
+            plt.close(fig)  # Free the figure so back-to-back experiments do not keep it alive
 
 
 class ExperimentPerformance:
@@ -1,11 +1,9 @@
-import itertools
+from collections import deque
 import numpy as np
 import logging
-import pandas as pd
 import random
-from scipy.optimize import minimize, Bounds
 import math
-from Simulation import Simulation
+import Simulation
 
 import PO
 
@@ -89,8 +87,8 @@ class Firm:
             [t=12] Product received at beginning of time 12
     shippedPos: list
         A list of PO objects that have been produced and also shipped.
-    shippingQueue: list
-        A list of PO objects that have been produced and are waiting to be shipped.
+    shippingQueue: deque
+        A FIFO queue of PO objects that have been produced and are waiting to be shipped.
     supplierList: list
         A list of integers signifying the firm number for each of the focal firm's suppliers. Raw materials supplier
         is '-99'
@@ -150,7 +148,7 @@ class Firm:
         WIP and FG (i.e. that every finished good only takes one WIP to make the product).
     orderSupplies(currentTimePeriod)
         A method to represent the real-life process of ordering supplies for expected future demand.
-    production():
+    production(randomState=random):
         A function to represent the real-life production decision process. The function looks at its current WIP inventory
         and determines which and how much finished goods to produce.
 
@@ -188,13 +186,28 @@ class Firm:
         A call to calculateFutureDemand(...) is made and an int representing the single-time-period demand forecast is
         returned. desiredWipInventory (a function of alpha and futureDemand) is updated and then recorded in the ledger.
         forecasted demand is then updated in the demandForecastArray for all times: [t+1, t+shipDelay+1]
-    warningLoop(listToCheck, funcName)
-        A function used for logging purposes. Will check the length of a list that is about to be looped through.
-        Will output a warning in the log if the list is longer than 10. This helps to identify potential causes of
-        long processing times.
     """
     #idIter = itertools.count()  # Class variable
 
+    # The attribute sendData returns for each option
+    _sendDataAttributes = {'Ledger': '_ledger',
+                           'Demand': '_actualizedDemandArray',
+                           'CostMoney': '_actualizedCostMoneyArray',
+                           'CostCO2': '_actualizedCostCO2Array',
+                           'CostWater': '_actualizedCostWaterArray',
+                           'Backlog': '_backlogArray',
+                           'Electricity': '_actualizedCostElectricityArray'}
+
+    # Backing attributes of every firm. Slots keep firms small and make attribute access a fixed offset; subclasses
+    # declare their own __slots__ (empty if they add no attributes) so no firm gets a __dict__
+    __slots__ = ('_actualizedCostCO2Array', '_actualizedCostElectricityArray', '_actualizedCostMoneyArray',
+                 '_actualizedCostWaterArray', '_actualizedCosts', '_actualizedDemandArray', '_alpha', '_backlogArray',
+                 '_closedCustomerPos', '_closedSupplierPos', '_cumulativeBacklogArray', '_customerList',
+                 '_customerPoList', '_demandForecastArray', '_desiredWipInventory', '_fgInventory', '_historyTime',
+                 '_id', '_ledger', '_poById', '_poList', '_producedPos', '_productionOrder', '_productionQueue',
+                 '_queueOrderAmt', '_runTime', '_shipDelay', '_shippedPos', '_shippingQueue', '_supplierList',
+                 '_timeIndex', '_timePeriod', '_totalTime', '_wipInventory', '_wipUsed')
+
     def __init__(self,
                  alpha,
                  runTime,
@@ -210,11 +223,12 @@ class Firm:
                  ):
         # Initializations that are dependent for later initializations
         self._id = idNum
-        logging.info(f"Assigned number {self._id} to {type(self)}")
+        logging.info("Assigned number %s to %s", self._id, type(self))
 
         self._historyTime = historyTime
-        logging.debug(f"Firm {self._id}, t=SETUP: Set alpha to {self._historyTime}")
-        if not isinstance(historyTime, int):
+        logging.debug("Firm %s, t=SETUP: Set alpha to %s", self._id, self._historyTime)
+        # Type checks only run in debug mode (they are skipped under python -O); the value checks always run
+        if __debug__ and not isinstance(historyTime, int):
             message = "historyTime must be an int"
             logging.error(message)
             raise TypeError(message)
@@ -227,8 +241,8 @@ class Firm:
             logging.warning(message)
 
         self._runTime = runTime
-        logging.debug(f"Firm {self._id}, t=SETUP: Set runTime to {self._runTime}")
-        if not isinstance(runTime, int):
+        logging.debug("Firm %s, t=SETUP: Set runTime to %s", self._id, self._runTime)
+        if __debug__ and not isinstance(runTime, int):
             message = "Runtime must be an int"
             logging.error(message)
             raise TypeError(message)
@@ -241,8 +255,8 @@ class Firm:
             logging.warning(message)
 
         self._shipDelay = shipDelay
-        logging.debug(f"Firm {self._id}, t=SETUP: Set shipDelay to {self._shipDelay}")
-        if not isinstance(shipDelay, int):
+        logging.debug("Firm %s, t=SETUP: Set shipDelay to %s", self._id, self._shipDelay)
+        if __debug__ and not isinstance(shipDelay, int):
             message = "shipDelay must be an int"
             logging.error(message)
             raise TypeError(message)
@@ -258,63 +272,59 @@ class Firm:
             logging.warning(message)
 
         self._timePeriod = 0
-        logging.debug(f"Firm {self._id}, t=SETUP: Set initial timePeriod to {self._timePeriod}")
+        logging.debug("Firm %s, t=SETUP: Set initial timePeriod to %s", self._id, self._timePeriod)
 
         self._totalTime = int(runTime + historyTime)
-        logging.debug(f"Firm {self._id}, t=SETUP: Set totalTime to {self._totalTime}")
+        logging.debug("Firm %s, t=SETUP: Set totalTime to %s", self._id, self._totalTime)
 
-        # Remaining initializations are alphabetized
-        self._actualizedDemandArray = np.zeros(self._totalTime, dtype=int)
-        self._actualizedCostMoneyArray = np.zeros(self._totalTime, dtype=float)
-        self._actualizedCostCO2Array   = np.zeros(self._totalTime, dtype=float)
-        self._actualizedCostWaterArray = np.zeros(self._totalTime, dtype=float)
+        # Remaining initializations are alphabetized. actualizedDemandArray is a view of the ledger, set up with it
+        # below
+        # The money, CO2, water, and electricity costs share one (4, totalTime) block; the four cost arrays are its rows
+        self._actualizedCosts = np.zeros((4, self._totalTime), dtype=float)
+        self._setCostViews()
         self._backlogArray = np.zeros(self._totalTime, dtype=int)
-        self._actualizedCostElectricityArray = np.zeros(self._totalTime, dtype=float)
         self._cumulativeBacklogArray = np.zeros(self._totalTime, dtype=int)
-        
-
 
-        logging.debug(f"Firm {self._id}, t=SETUP: Established actualizedDemandArray of type "
-                      f"{type(self._actualizedDemandArray)} and size {self._totalTime} ")
 
         self._alpha = alpha
-        logging.debug(f"Firm {self._id}, t=SETUP: Set alpha to {self._alpha}")
+        logging.debug("Firm %s, t=SETUP: Set alpha to %s", self._id, self._alpha)
+        if __debug__ and not (isinstance(alpha, float) or isinstance(alpha, int)):
+            message = "Alpha value must be either an int or a float"
+            logging.error(message)
+            raise TypeError(message)
         if alpha < 0:
             message = "Alpha value cannot be less than zero"
             logging.error(message)
             raise Exception(message)
-        if not (isinstance(alpha, float) or isinstance(alpha, int)):
-            message = "Alpha value must be either an int or a float"
-            logging.error(message)
-            raise TypeError(message)
 
         self._closedCustomerPos = []
-        logging.debug(f"Firm {self._id}, t=SETUP: Created empty list closedCustomerPos")
+        logging.debug("Firm %s, t=SETUP: Created empty list closedCustomerPos", self._id)
 
         self._closedSupplierPos = []
-        logging.debug(f"Firm {self._id}, t=SETUP: Created empty list closedSupplierPos")
+        logging.debug("Firm %s, t=SETUP: Created empty list closedSupplierPos", self._id)
 
         if customerList is None:
             customerList = []
-            logging.debug(f"Firm {self._id}, t=SETUP: Created empty list customerList")
+            logging.debug("Firm %s, t=SETUP: Created empty list customerList", self._id)
         self.customerList = customerList
 
         if customerPoList is None:
             customerPoList = []
-            logging.debug(f"Firm {self._id}, t=SETUP: Created empty list customerPoList")
+            logging.debug("Firm %s, t=SETUP: Created empty list customerPoList", self._id)
         self.customerPoList = customerPoList
 
         arraySize = self._totalTime + self._shipDelay
-        self._demandForecastArray = np.zeros(arraySize, dtype=int)
-        logging.debug(f"Firm {self._id}, t=SETUP: Established demandForecastArray of type "
-                      f"{type(self._demandForecastArray)} and size {arraySize}")
+        # Pinned to int64 (the platform int is 32-bit on Windows) so the forecast sums behave the same everywhere
+        self._demandForecastArray = np.zeros(arraySize, dtype=np.int64)
+        logging.debug("Firm %s, t=SETUP: Established demandForecastArray of type %s and size %s",
+                      self._id, type(self._demandForecastArray), arraySize)
 
         self._desiredWipInventory = 0
-        logging.debug(f"Firm {self._id}, t=SETUP: Set initial desiredWipInventory to {self._desiredWipInventory}")
+        logging.debug("Firm %s, t=SETUP: Set initial desiredWipInventory to %s", self._id, self._desiredWipInventory)
 
         self._fgInventory = fgInventory
-        logging.debug(f"Firm {self._id}, t=SETUP: Set initial fgInventory to {self._fgInventory}")
-        if not isinstance(fgInventory, int):
+        logging.debug("Firm %s, t=SETUP: Set initial fgInventory to %s", self._id, self._fgInventory)
+        if __debug__ and not isinstance(fgInventory, int):
             message = "fgInventory must be an int"
             logging.error(message)
             raise TypeError(message)
@@ -323,7 +333,9 @@ class Firm:
             logging.error(message)
             raise Exception(message)
 
-        self._ledger = np.zeros((self._historyTime, 18), dtype=int)
+        # Every column holds unit counts that fit comfortably in int32, half the width of the platform int. Sized for
+        # the whole run up front, so it is never grown. Stored column-major so each column is contiguous
+        self._ledger = np.zeros((self._totalTime, 18), dtype=np.int32, order='F')
         """
             Ledger Columns:
                 [0] time
@@ -345,40 +357,49 @@ class Firm:
                 [16] forecasted_demand
                 [17] actual_demand
         """
-        logging.debug(f"Firm {self._id}, t=SETUP: Established ledger of type {type(self._ledger)} and size "
-                      f"[{self._historyTime} x 18]")
+        logging.debug("Firm %s, t=SETUP: Established ledger of type %s and size [%s x 18], dtype int32",
+                      self._id, type(self._ledger), self._totalTime)
+        # The actual_demand column and actualizedDemandArray are the same data, so the array is a view of the column
+        self._actualizedDemandArray = self._ledger[:, 17]
+        logging.debug("Firm %s, t=SETUP: Established actualizedDemandArray of type %s and size %s ",
+                      self._id, type(self._actualizedDemandArray), self._totalTime)
 
         if poList is None:
             poList = []
-            logging.debug(f"Firm {self._id}, t=SETUP: Created empty list poList")
+            logging.debug("Firm %s, t=SETUP: Created empty list poList", self._id)
         self.poList = poList
 
         self._producedPos = []
-        logging.debug(f"Firm {self._id}, t=SETUP: Created empty list producedPos")
+        logging.debug("Firm %s, t=SETUP: Created empty list producedPos", self._id)
 
         self._productionOrder = 0
-        logging.debug(f"Firm {self._id}, t=SETUP: Set initial productionOrder to {self._productionOrder}")
+        logging.debug("Firm %s, t=SETUP: Set initial productionOrder to %s", self._id, self._productionOrder)
 
         self._productionQueue = []
-        logging.debug(f"Firm {self._id}, t=SETUP: Created empty list productionQueue")
+        logging.debug("Firm %s, t=SETUP: Created empty list productionQueue", self._id)
+
+        # Running total of orderAmt over the POs in productionQueue, kept by receiveCustomerDemand and endOfDay
+        self._queueOrderAmt = 0
+        # WIP used by the day's production, set by production and read by endOfDay
+        self._wipUsed = 0
 
         self._shippedPos = []
-        logging.debug(f"Firm {self._id}, t=SETUP: Created empty list shippedPos")
+        logging.debug("Firm %s, t=SETUP: Created empty list shippedPos", self._id)
 
-        self._shippingQueue = []
-        logging.debug(f"Firm {self._id}, t=SETUP: Created empty list shippingQueue")
+        self._shippingQueue = deque()
+        logging.debug("Firm %s, t=SETUP: Created empty deque shippingQueue", self._id)
 
         if supplierList is None:
             supplierList = []
-            logging.debug(f"Firm {self._id}, t=SETUP: Created empty list supplierList")
+            logging.debug("Firm %s, t=SETUP: Created empty list supplierList", self._id)
         self.supplierList = supplierList
 
         # Error checking has already been performed on historyTime
         self._timeIndex = historyTime
-        logging.debug(f"Firm {self._id}, t=SETUP: Set initial timeIndex to {self._timeIndex}")
+        logging.debug("Firm %s, t=SETUP: Set initial timeIndex to %s", self._id, self._timeIndex)
 
         self._wipInventory = wipInventory
-        if not isinstance(wipInventory, int):
+        if __debug__ and not isinstance(wipInventory, int):
             message = "wipInventory must be an int"
             logging.error(message)
             raise TypeError(message)
@@ -387,7 +408,45 @@ class Firm:
             logging.error(message)
             raise Exception(message)
 
-        logging.info(f"Firm {self._id}, t=SETUP: Initialization is complete.")
+        logging.info("Firm %s, t=SETUP: Initialization is complete.", self._id)
+
+    def __setstate__(self, state):
+        """
+        Restores a pickled firm (firms are pickled to the worker processes). Pickling copies actualizedDemandArray
+        and the cost arrays separately from the arrays they view, so they are made views of the ledger's actual_demand
+        column and of the rows of actualizedCosts again.
+
+        :param tuple state:
+            The (dict state, slot state) pair pickle creates for objects with __slots__
+        :return:
+        """
+        for key, value in state[1].items():
+            setattr(self, key, value)
+        self._actualizedDemandArray = self._ledger[:, 17]
+        self._setCostViews()
+
+    def _registerPos(self, newPos):
+        """
+        Adds POs the firm has placed with its suppliers to poList and to the by-id index of open POs. Every path that
+        creates supply POs goes through here, so the two cannot drift apart.
+
+        :param list newPos:
+            The new PO objects
+        :return:
+        """
+        self._poList.extend(newPos)
+        self._poById.update((po.id, po) for po in newPos)
+
+    def _setCostViews(self):
+        """
+        Points the money, CO2, water, and electricity cost arrays at their rows of actualizedCosts.
+
+        :return:
+        """
+        (self._actualizedCostMoneyArray,
+         self._actualizedCostCO2Array,
+         self._actualizedCostWaterArray,
+         self._actualizedCostElectricityArray) = self._actualizedCosts
 
     # Getters and setters
     @property
@@ -398,19 +457,21 @@ class Firm:
     def customerList(self, value):
         if not value:
             self._customerList = []
-            logging.debug(f"Firm {self._id}, t=SETUP: Created empty list customerList")
+            logging.debug("Firm %s, t=SETUP: Created empty list customerList", self._id)
         else:
-            self._customerList = value
-            logging.debug(f"Firm {self._id}, t=SETUP: Created customerList with values {value} ")
+            # Validated before it is assigned. The per-element check only runs in debug mode (not under python -O)
             if not isinstance(value, list):
                 message = "customerList must be a list object"
                 logging.error(message)
                 raise TypeError(message)
-            for customer in value:
-                if not isinstance(customer, int):
-                    message = "Customer value in customerList must be an integer"
-                    logging.error(message)
-                    raise TypeError(message)
+            if __debug__:
+                for customer in value:
+                    if not isinstance(customer, int):
+                        message = "Customer value in customerList must be an integer"
+                        logging.error(message)
+                        raise TypeError(message)
+            self._customerList = value
+            logging.debug("Firm %s, t=SETUP: Created customerList with values %s ", self._id, value)
         if self._timePeriod > 0:
             logging.warning(f"Firm {self._id}, t={self._timePeriod}: customerlist changed after the simulation has "
                             f"started to run")
@@ -423,19 +484,20 @@ class Firm:
     def customerPoList(self, value):
         if not value:
             self._customerPoList = []
-            logging.debug(f"Firm {self._id}, t={self._timePeriod}: Created empty list customerPoList")
+            logging.debug("Firm %s, t=%s: Created empty list customerPoList", self._id, self._timePeriod)
         else:
-            self._customerPoList = value
-            logging.debug(f"Firm {self._id}, t={self._timePeriod}: Created customerPoList with values {value}")
             if not isinstance(value, list):
                 message = "customerPoList must be a list object"
                 logging.error(message)
                 raise TypeError(message)
-            for po in value:
-                if not isinstance(po, PO.PO):
-                    message = "Objects in customerPoList must be PO objects"
-                    logging.error(message)
-                    raise TypeError(message)
+            if __debug__:
+                for po in value:
+                    if not isinstance(po, PO.PO):
+                        message = "Objects in customerPoList must be PO objects"
+                        logging.error(message)
+                        raise TypeError(message)
+            self._customerPoList = value
+            logging.debug("Firm %s, t=%s: Created customerPoList with values %s", self._id, self._timePeriod, value)
 
     @property
     def historyTime(self):
@@ -453,19 +515,23 @@ class Firm:
     def poList(self, value):
         if not value:
             self._poList = []
-            logging.debug(f"Firm {self._id}, t={self._timePeriod}: Created empty list poList")
+            self._poById = {}
+            logging.debug("Firm %s, t=%s: Created empty list poList", self._id, self._timePeriod)
         else:
-            self._poList = value
-            logging.debug(f"Firm {self._id}, t={self._timePeriod}: Created poList with values {value}")
             if not isinstance(value, list):
                 message = "poList must be a list object"
                 logging.error(message)
                 raise TypeError(message)
-            for po in value:
-                if not isinstance(po, PO.PO):
-                    message = "Objects in poList must be PO objects"
-                    logging.error(message)
-                    raise TypeError(message)
+            if __debug__:
+                for po in value:
+                    if not isinstance(po, PO.PO):
+                        message = "Objects in poList must be PO objects"
+                        logging.error(message)
+                        raise TypeError(message)
+            self._poList = value
+            # Index of the open POs by id, kept in step with poList by _registerPos and endOfDay
+            self._poById = {po.id: po for po in value}
+            logging.debug("Firm %s, t=%s: Created poList with values %s", self._id, self._timePeriod, value)
 
     @property
     def productionQueue(self):
@@ -487,19 +553,20 @@ class Firm:
     def supplierList(self, value):
         if not value:
             self._supplierList = []
-            logging.debug(f"Firm {self._id}, t={self._timePeriod}: Created empty list supplierList")
+            logging.debug("Firm %s, t=%s: Created empty list supplierList", self._id, self._timePeriod)
         else:
-            self._supplierList = value
-            logging.debug(f"Firm {self._id}, t={self._timePeriod}: Created supplierList with values {value}")
             if not isinstance(value, list):
                 message = "supplierList must be a list object"
                 logging.error(message)
                 raise TypeError(message)
-            for supplier in value:
-                if not isinstance(supplier, int):
-                    message = "Supplier value in supplierList must be an integer"
-                    logging.error(message)
-                    raise TypeError(message)
+            if __debug__:
+                for supplier in value:
+                    if not isinstance(supplier, int):
+                        message = "Supplier value in supplierList must be an integer"
+                        logging.error(message)
+                        raise TypeError(message)
+            self._supplierList = value
+            logging.debug("Firm %s, t=%s: Created supplierList with values %s", self._id, self._timePeriod, value)
         if self._timePeriod > 0:
             logging.warning("supplierList changed after the simulation has started to run")
 
@@ -515,10 +582,8 @@ class Firm:
         self._actualizedCostMoneyArray[idx] = moneyCost
         self._actualizedCostCO2Array[idx]   = co2Cost
         self._actualizedCostWaterArray[idx] = waterCost
-        logging.debug(
-            f"Firm {self._id}, t={self._timePeriod}, f=actualizeCost(): "
-            f"Money=${moneyCost:.2f}, CO2={co2Cost:.2f} lbs, Water={waterCost:.2f} gal"
-        )
+        logging.debug("Firm %s, t=%s, f=actualizeCost(): Money=$%.2f, CO2=%.2f lbs, Water=%.2f gal",
+                      self._id, self._timePeriod, moneyCost, co2Cost, waterCost)
 
     
     def actualizeDemand(self, amount):
@@ -529,8 +594,7 @@ class Firm:
 
         idx = self._timeIndex
 
-        self._actualizedDemandArray[idx] = amount
-        self._ledger[idx, 17] = amount
+        self._actualizedDemandArray[idx] = amount  # Also the ledger's actual_demand column
 
         shipped = min(self._fgInventory, amount)
         self._fgInventory -= shipped
@@ -547,17 +611,14 @@ class Firm:
         self._cumulativeBacklogArray[idx] = total_unfilled
 
         if total_unfilled > 0 :
-            num_pallets = math.ceil(total_unfilled/Simulation.pallet_weight_lb)
-            electr_cost = (num_pallets * Simulation.kwh_oer_pallet_per_day)
+            num_pallets = math.ceil(total_unfilled/Simulation.Simulation.pallet_weight_lb)
+            electr_cost = (num_pallets * Simulation.Simulation.kwh_per_pallet_per_day)
 
             self._actualizedCostMoneyArray[idx] += electr_cost
             
 
-        logging.debug(
-            f"Firm {self._id}, t={self._timePeriod}: "
-            f"Demand={amount}, shipped={shipped}, new_backlog={new_backlog}, "
-            f"total_unfilled={total_unfilled}, FG left={self._fgInventory}"
-        )
+        logging.debug("Firm %s, t=%s: Demand=%s, shipped=%s, new_backlog=%s, total_unfilled=%s, FG left=%s",
+                      self._id, self._timePeriod, amount, shipped, new_backlog, total_unfilled, self._fgInventory)
 
 
     def beginningOfDay(self):
@@ -583,21 +644,20 @@ class Firm:
         """
         if smoothingValue == 1:  # No smoothing
             newDemand = int(self._actualizedDemandArray[self._timeIndex])
-            message = f"Firm {self._id}, t={self._timePeriod}, f=calculateFutureDemand(): Smoothing off; future demand " \
-                      f"equals current time period demand: {newDemand}"
+            logging.debug("Firm %s, t=%s, f=calculateFutureDemand(): Smoothing off; future demand equals current "
+                          "time period demand: %s", self._id, self._timePeriod, newDemand)
         elif smoothingValue == 2:  # Smoothing on
             value1 = self._actualizedDemandArray[self._timeIndex]
             value2 = self._demandForecastArray[self._timeIndex]
             newDemand = int((value1 + value2) / 2)
-            message = f"Firm {self._id}, t={self._timePeriod}, f=calculateFutureDemand(): A demand projection of " \
-                      f"{newDemand} was calculated by" \
-                      f"averaging current demand ({value1}) and the current time's forecast ({value2})"
+            logging.debug("Firm %s, t=%s, f=calculateFutureDemand(): A demand projection of %s was calculated "
+                          "by averaging current demand (%s) and the current time's forecast (%s)",
+                          self._id, self._timePeriod, newDemand, value1, value2)
         else:
             message = f"Firm {self._id}, t={self._timePeriod}, f=calculateFutureDemand(): Smoothing value chosen is not " \
                       f"recognized"
             logging.error(message)
             raise Exception(message)
-        logging.debug(message)
         return newDemand
 
     def calculateHistoricalDemand(self, demandMu):
@@ -617,13 +677,11 @@ class Firm:
         :return:
             calculated sales during delay
         """
-        salesDuringDelay = 0
         endTime = self._shipDelay - 1
-        for time in range(endTime):
-            salesDuringDelay += self._demandForecastArray[self._timePeriod + self._shipDelay + time]
-        message = f"Firm {self._id}, t={self._timePeriod}, f=calculateSalesDuringDelay(): A value for salesDuringDelay " \
-                  f"was calculated as {salesDuringDelay} by adding up {endTime} future time periods"
-        logging.debug(message)
+        start = self._timePeriod + self._shipDelay
+        salesDuringDelay = int(self._demandForecastArray[start:start + endTime].sum())
+        logging.debug("Firm %s, t=%s, f=calculateSalesDuringDelay(): A value for salesDuringDelay was calculated as %s "
+                      "by adding up %s future time periods", self._id, self._timePeriod, salesDuringDelay, endTime)
         return salesDuringDelay
 
     def calculateSupplyInTransit(self):
@@ -634,17 +692,16 @@ class Firm:
         :return:
             calculated amount of supply currently in transit
         """
-        supplyInTransit = 0
-        count = 0
-        self.warningLoop(self.poList, "calculateSupplyInTransit()")
-        for po in self.poList:
-            if po.arrivalTime > self._timePeriod and not po.customerClosed:
-                supplyInTransit += po.fulfilledAmt  # Assumes that the customer knows they were shorted when
-                # product ships
-                count += 1  # For logging purposes
-        logging.debug(
-            f"Firm {self._id}, t={self._timePeriod}, f=calculateSupplyInTransit(): A value of {supplyInTransit} "
-            f"was calculated for the total supply in transit, with {count} PO's outstanding.")
+        if __debug__ and len(self._poList) > 10:
+            logging.warning("Firm %s, t=%s, f=calculateSupplyInTransit(): Looping through a PO list of size %s",
+                            self._id, self._timePeriod, len(self._poList))
+        timePeriod = self._timePeriod
+        # One pass over the open POs. Assumes that the customer knows they were shorted when product ships
+        inTransit = [po.fulfilledAmt for po in self._poList if po.arrivalTime > timePeriod and not po.customerClosed]
+        supplyInTransit = sum(inTransit)
+        count = len(inTransit)  # For logging purposes
+        logging.debug("Firm %s, t=%s, f=calculateSupplyInTransit(): A value of %s was calculated for the total supply "
+                      "in transit, with %s PO's outstanding.", self._id, self._timePeriod, supplyInTransit, count)
         return supplyInTransit
 
     def calculateSupplyOrder(self):
@@ -664,11 +721,11 @@ class Firm:
                            supplyInTransit -  # Inventory expected on the way
                            wipInventory))  # Current WIP inventory
         self._ledger[self._timeIndex, 14] = supplyInTransit  # wip_in_transit column
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=calculateSupplyOrder(): A value of {order} was "
-                      f"calculated for the supply order"
-                      f"and was logged in the ledger, calculated as\n desiredWipInventory ({desiredWipInventory}) + "
-                      f"salesDuringDelay ({salesDuringDelay}) - supplyInTransit ({supplyInTransit}) - wipInventory "
-                      f"({wipInventory})")
+        logging.debug("Firm %s, t=%s, f=calculateSupplyOrder(): A value of %s was calculated for the supply "
+                      "order and was logged in the ledger, calculated as\n desiredWipInventory (%s) + "
+                      "salesDuringDelay (%s) - supplyInTransit (%s) - wipInventory (%s)",
+                      self._id, self._timePeriod, order, desiredWipInventory, salesDuringDelay, supplyInTransit,
+                      wipInventory)
         return order
 
     def chooseSuppliers(self, currentTimePeriod):
@@ -691,18 +748,11 @@ class Firm:
             A list of PO objects that are originated by the focal firm, sent to suppliers
         :return:
         """
-        count1 = 0
-        count2 = 0
-        self.warningLoop(custPos, "createHistory()")
-        for po in custPos:
-            self._customerPoList.append(po)
-            count1 += 1
-        self.warningLoop(supPos, "createHistory()")
-        for po in supPos:
-            self._poList.append(po)
-            count2 += 1
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=createHistory(): Appended {count1} historical PO's to "
-                      f"customerPOList and {count2} historical PO's to poList.")
+        # History is loaded once per simulation and is expected to be long, so there is no long-loop warning here
+        self._customerPoList.extend(custPos)
+        self._registerPos(supPos)
+        logging.debug("Firm %s, t=%s, f=createHistory(): Appended %s historical PO's to customerPOList and %s "
+                      "historical PO's to poList.", self._id, self._timePeriod, len(custPos), len(supPos))
 
     def createPo(self, supplier, orderAmt, orderTime):
         """
@@ -715,16 +765,15 @@ class Firm:
         :param int orderTime:
             Time period order was placed
         :return:
-            A list object (which is mutable) containing the purchase order, which allows the PO to be changed later
+            The new PO object. POs are mutable, so the caller can change it later
         """
         firmId = self._id
         purchaseOrder = PO.PO(firmId, supplier, orderAmt, orderTime)
-        self.poList.append(purchaseOrder)
-        length = len(self.poList)
-        logging.debug(
-            f"Firm {firmId}, t={self._timePeriod}, f=createPo(): Created a new PO with supplier {supplier} and "
-            f"amount {orderAmt}, in time period {orderTime}. Appended PO to poList, now of length {length}")
-        return [purchaseOrder]
+        self._registerPos((purchaseOrder,))
+        logging.debug("Firm %s, t=%s, f=createPo(): Created a new PO with supplier %s and amount %s, in time "
+                      "period %s. Appended PO to poList, now of length %s",
+                      firmId, self._timePeriod, supplier, orderAmt, orderTime, len(self._poList))
+        return purchaseOrder
 
     def createProductionOrder(self):
         """
@@ -733,23 +782,20 @@ class Firm:
 
         :return:
         """
-        productionAmount = 0
         wipInventory = self._wipInventory
-        self.warningLoop(self.productionQueue, "createProductionOrder()")  # Used for simulation performance purposes
-        for queuePo in self.productionQueue:
-            productionAmount += queuePo.orderAmt
+        productionAmount = self._queueOrderAmt  # Total ordered over the queue, kept up to date as POs come and go
         if productionAmount > wipInventory:
             logging.warning(
                 f"Firm {self._id}, t={self._timePeriod}, f=createProductionOrder(): Not enough WIP inventory "
                 f"to produce desired amount.\nWanted to produce {productionAmount}, only able to produce "
                 f"{wipInventory}")
             productionAmount = wipInventory
-        if productionAmount < 0:
+        if __debug__ and productionAmount < 0:  # Cannot happen unless WIP inventory went negative; skipped under -O
             raise Exception("Production order cannot be less than 0")
         self._productionOrder = productionAmount
         self._ledger[self._timeIndex, 9] = productionAmount  # total_new_production_orders column
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=createProductionOrder(): Created production order for "
-                      f"{productionAmount} units and logged in the ledger.")
+        logging.debug("Firm %s, t=%s, f=createProductionOrder(): Created production order for %s units and logged in "
+                      "the ledger.", self._id, self._timePeriod, productionAmount)
 
     def createSupplyOrders(self, amount):
         """
@@ -760,14 +806,13 @@ class Firm:
         :return:
             A list of PO objects to be sent to the supplier.
         """
-        newPoList = []
-        count = 0
-        for supplier in self.supplierList:
-            newPo = self.createPo(supplier, amount, self._timePeriod)
-            newPoList.append(newPo[0])
-            count += 1
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=createSupplyOrders: Created {count} new supply orders "
-                      f"of amount {amount}.")
+        # Every order shares the amount and time, so they are built in one pass rather than through createPo
+        firmId = self._id
+        timePeriod = self._timePeriod
+        newPoList = [PO.PO(firmId, supplier, amount, timePeriod) for supplier in self.supplierList]
+        self._registerPos(newPoList)
+        logging.debug("Firm %s, t=%s, f=createSupplyOrders: Created %s new supply orders of amount %s.",
+                      firmId, timePeriod, len(newPoList), amount)
         return newPoList
 
     def endOfDay(self):
@@ -776,54 +821,89 @@ class Firm:
 
         :return:
         """
-        # End of day error checking
-        if self._wipInventory < 0:
+        # End of day error checking. These are invariants of a correct simulation, so they are skipped under python -O
+        if __debug__ and self._wipInventory < 0:
             logging.error(f"Firm {self._id}, t={self._timePeriod}, f=endOfDay: WIP inventory has become negative.")
             raise Exception("WIP inventory has become negative")
-        if self._fgInventory < 0:
+        if __debug__ and self._fgInventory < 0:
             logging.error(f"Firm {self._id}, t={self._timePeriod}, f=endOfDay: FG inventory has become negative.")
             raise Exception("FG inventory has become negative")
-        wipMaterialsUsed = 0
-        self.warningLoop(self.productionQueue, "endOfDay()")
-        for po in self.productionQueue:
-            wipMaterialsUsed += po.fulfilledAmt
-        self._ledger[self._timeIndex, 4] = wipMaterialsUsed  # WIP Materials Used in Production
-        self._ledger[self._timeIndex, 10] = wipMaterialsUsed  # Finished goods produced
-        # Clears production queue only if it is closed by the supplier
-        self.productionQueue[:] = [po for po in self.productionQueue if not po.supplierClosed]
-        queueLength = len(self.productionQueue)
+        # Today's ledger row, as a view, so each of the writes below is a single 1-D index
+        ledgerRow = self._ledger[self._timeIndex]
+        wipMaterialsUsed = self._wipUsed
+        self._wipUsed = 0
+        ledgerRow[4] = wipMaterialsUsed  # WIP Materials Used in Production
+        ledgerRow[10] = wipMaterialsUsed  # Finished goods produced
+        # Clears production queue only if it is closed by the supplier, taking the cleared orders off the running total
+        productionQueue = self._productionQueue
+        if __debug__ and len(productionQueue) > 10:
+            logging.warning("Firm %s, t=%s, f=endOfDay(): Looping through a PO list of size %s",
+                            self._id, self._timePeriod, len(productionQueue))
+        openQueue = []
+        clearedAmt = 0
+        for po in productionQueue:
+            if po.supplierClosed:
+                clearedAmt += po.orderAmt
+            else:
+                openQueue.append(po)
+        self._queueOrderAmt -= clearedAmt
+        # production() closes every PO it sees, so the queue normally just empties in place
+        if openQueue:
+            productionQueue[:] = openQueue
+        else:
+            productionQueue.clear()
+        queueLength = len(productionQueue)
         if queueLength > 0:
             logging.warning(
                 f"Firm {self._id}, t={self._timePeriod}, f=endOfDay: Attempted to clear production queue, but "
                 f"{queueLength} PO's remain.")
-        self._ledger[self._historyTime + self._timePeriod, 0] = self._timePeriod
+        ledgerRow[0] = self._timePeriod  # time column (timeIndex is always historyTime + timePeriod)
         # Input all the ending values for current time period
-        self._ledger[self._timeIndex, 5] = self._wipInventory
-        self._ledger[self._timeIndex, 13] = self._fgInventory
-        self._ledger[self._timeIndex, 16] = self._demandForecastArray[self._timeIndex]
+        ledgerRow[5] = self._wipInventory  # ending_wip_inventory
+        ledgerRow[13] = self._fgInventory  # ending_fg_inventory
+        ledgerRow[16] = self._demandForecastArray[self._timeIndex]  # forecasted_demand
         # Clean up some random issues
         # (If total_wip_received in current time is 0 and production_wip_inventory is 0)
-        if self._ledger[self._timeIndex, 2] == 0 and self._ledger[self._timeIndex, 3] == 0:
+        if ledgerRow[2] == 0 and ledgerRow[3] == 0:
             # This issue arises when no po's are received in the current time period
             # (Set the production_wip_inventory to the beginning_wip_inventory
-            self._ledger[self._timeIndex, 3] = self._ledger[self._timeIndex, 1]
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=endOfDay: Finished updating ledger")
+            ledgerRow[3] = ledgerRow[1]
+        logging.debug("Firm %s, t=%s, f=endOfDay: Finished updating ledger", self._id, self._timePeriod)
         # Move closed POs to a new list
+        # One walk per list sorts each PO into the closed list or the list of POs still open
         count = 0
-        self.warningLoop(self.customerPoList, "endOfDay()")
-        for po in self.customerPoList:
+        customerPoList = self._customerPoList
+        if __debug__ and len(customerPoList) > 10:
+            logging.warning("Firm %s, t=%s, f=endOfDay(): Looping through a PO list of size %s",
+                            self._id, self._timePeriod, len(customerPoList))
+        openPos = []
+        closePo = self._closedCustomerPos.append
+        keepPo = openPos.append
+        for po in customerPoList:
             if po.closed:
-                self._closedCustomerPos.append(po)
+                closePo(po)
                 count += 1
-        self.warningLoop(self.poList, "endOfDay()")
-        for po in self.poList:
+            else:
+                keepPo(po)
+        customerPoList[:] = openPos
+        poList = self._poList
+        if __debug__ and len(poList) > 10:
+            logging.warning("Firm %s, t=%s, f=endOfDay(): Looping through a PO list of size %s",
+                            self._id, self._timePeriod, len(poList))
+        openPos = []
+        closePo = self._closedSupplierPos.append
+        keepPo = openPos.append
+        poById = self._poById
+        for po in poList:
             if po.closed:
-                self._closedSupplierPos.append(po)
+                closePo(po)
+                del poById[po.id]
                 count += 1
-        self.customerPoList[:] = [po for po in self.customerPoList if not po.closed]
-        self.poList[:] = [po for po in self.poList if not po.closed]
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=endOfDay: Moved {count} closed PO's to new list."
-                      f"customerPoList length: {len(self.customerPoList)}. poList length: {len(self.poList)}")
+            else:
+                keepPo(po)
+        poList[:] = openPos
+        logging.debug("Firm %s, t=%s, f=endOfDay: Moved %s closed PO's to new list. customerPoList length: %s. poList "
+                      "length: %s", self._id, self._timePeriod, count, len(customerPoList), len(poList))
         # Advance the time period
         self._timePeriod += 1
         self._timeIndex += 1
@@ -831,7 +911,7 @@ class Firm:
         if self._timeIndex < self._totalTime:
             self._ledger[self._timeIndex, 1] = self._wipInventory
             self._ledger[self._timeIndex, 7] = self._fgInventory
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=endOfDay: Advanced internal timePeriod.")
+        logging.debug("Firm %s, t=%s, f=endOfDay: Advanced internal timePeriod.", self._id, self._timePeriod)
 
     def initializeAgent(self, historicalWeeklyDemand):
         """
@@ -866,20 +946,19 @@ class Firm:
         be 100% efficient on the transfer from WIP to FG. It is also assumed that there is a 1:1 relationship between
         WIP and FG (i.e. that every finished good only takes one WIP to make the product).
 
-        :param list poToMake:
-            a list with a single PO object that is to be fulfilled. A list is passed so that the PO object can be
-            changed without creating a new object.
+        :param PO.PO poToMake:
+            The PO object that is to be fulfilled. It is updated in place.
         :param int amount:
             The amount of product to be produced. Can take on values 0 < amount <= orderedAmount
         :return:
         """
-        poToMake[0].updatePO({'fulfilledAmt': amount,
-                              'fulfilledTime': self._timePeriod})
+        poToMake.updatePO({'fulfilledAmt': amount,
+                           'fulfilledTime': self._timePeriod})
         self._fgInventory += amount
         self._wipInventory -= amount
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=makeProduct: Created {amount} new product.")
+        logging.debug("Firm %s, t=%s, f=makeProduct: Created %s new product.", self._id, self._timePeriod, amount)
 
-    def production(self):
+    def production(self, randomState=random):
         """
         A function to represent the real-life production decision process. The function looks at its current WIP inventory
         and determines which and how much finished goods to produce.
@@ -889,37 +968,53 @@ class Firm:
         Whatever is not produced in the current time period for a particular PO is cancelled. In other words, a supplier
         cannot partially fulfill an order in t and then fulfill the rest in t+1
 
+        :param random.Random randomState:
+            Optional argument. Shuffles the production queue. Defaults to the random module's global generator
         :return:
         """
         leftToProduce = self._productionOrder
-        self.warningLoop(self.productionQueue, "production()")
-        random.shuffle(self.productionQueue)  # Randomize the order of the queue so one customer doesnt always get prod
-        for po in self.productionQueue:  # Go through the production PO queue one at a time and try to make it
-            if leftToProduce < 0:
-                message = f"Firm {self._id}, t={self._timePeriod}, f=production(): leftToProduce value is less than 0."
+        productionQueue = self._productionQueue
+        if __debug__ and len(productionQueue) > 10:
+            logging.warning("Firm %s, t=%s, f=production(): Looping through a PO list of size %s",
+                            self._id, self._timePeriod, len(productionQueue))
+        # Randomize the order of the queue so one customer doesnt always get prod. Shuffling fewer than two POs draws no
+        # random numbers, so skipping it leaves the seeded random stream unchanged
+        if len(productionQueue) > 1:
+            randomState.shuffle(productionQueue)
+        # Bound once so the loop below does local lookups only
+        timePeriod = self._timePeriod
+        makeProduct = self.makeProduct
+        producePo = self._producedPos.append
+        shipPo = self._shippingQueue.append
+        for po in productionQueue:  # Go through the production PO queue one at a time and try to make it
+            if __debug__ and leftToProduce < 0:  # Invariant check, skipped under python -O
+                message = f"Firm {self._id}, t={timePeriod}, f=production(): leftToProduce value is less than 0."
                 logging.error(message)
                 raise Exception(message)
             po.supplierClosed = True  # All orders are closed in the time period they are received
+            orderAmt = po.orderAmt
             if leftToProduce == 0:
                 po.updatePO({'fulfilledAmt': 0,
-                             'fulfilledTime': self._timePeriod})
+                             'fulfilledTime': timePeriod})
                 """
                 A potential change here: if no product is made, close the po?
                 """
-                self.shippingQueue.append(po)  # Appending to shipping queue but not produced POs
-                logging.warning(f"Firm {self._id}, t={self._timePeriod}, f=production(): Unfulfilled PO moved to "
+                shipPo(po)  # Appending to shipping queue but not produced POs
+                logging.warning(f"Firm {self._id}, t={timePeriod}, f=production(): Unfulfilled PO moved to "
                                 f"shippingQueue.")
                 continue  # Move to next PO
-            elif po.orderAmt <= leftToProduce:  # Can produce the full amount
-                leftToProduce -= po.orderAmt
-                self.makeProduct([po], po.orderAmt)
+            elif orderAmt <= leftToProduce:  # Can produce the full amount
+                leftToProduce -= orderAmt
+                makeProduct(po, orderAmt)
             else:  # Can produce a partial (but not 0) amount
-                self.makeProduct([po], leftToProduce)
+                makeProduct(po, leftToProduce)
                 leftToProduce = 0
-            self._producedPos.append(po)
-            self.shippingQueue.append(po)
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=production(): Production complete, with "
-                      f"{leftToProduce} finished products still to produce.")
+            producePo(po)
+            shipPo(po)
+        # Everything made today came out of the production order, so this is the WIP used (read by endOfDay)
+        self._wipUsed = self._productionOrder - leftToProduce
+        logging.debug("Firm %s, t=%s, f=production(): Production complete, with %s finished products still to produce.",
+                      self._id, self._timePeriod, leftToProduce)
         self._ledger[self._timeIndex, 11] = self._fgInventory  # fg_inventory_after_production column
 
     def orderSupplies(self, currentTimePeriod):
@@ -938,7 +1033,7 @@ class Firm:
             logging.warning(f"Firm {self._id}, t={self._timePeriod}, f=orderSupplies: No WIP order placed.")
         else:
             orderList = self.createSupplyOrders(newOrder)
-            logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=orderSupplies: {newOrder} supplies ordered.")
+            logging.debug("Firm %s, t=%s, f=orderSupplies: %s supplies ordered.", self._id, self._timePeriod, newOrder)
         return orderList
 
     def receiveCustomerDemand(self, customerPOs):
@@ -952,14 +1047,17 @@ class Firm:
         """
         amount = 0
         count = 0
-        self.warningLoop(customerPOs, "receiveCustomerDemand()")
+        if __debug__ and len(customerPOs) > 10:
+            logging.warning("Firm %s, t=%s, f=receiveCustomerDemand(): Looping through a PO list of size %s",
+                            self._id, self._timePeriod, len(customerPOs))
         for po in customerPOs:
             self.customerPoList.append(po)
             self.productionQueue.append(po)
             amount += po.orderAmt
             count += 1
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=receiveCustomerDemand(): Created {count} PO's for a "
-                      f"total amount of {amount} product")
+        self._queueOrderAmt += amount
+        logging.debug("Firm %s, t=%s, f=receiveCustomerDemand(): Created %s PO's for a total amount of %s product",
+                      self._id, self._timePeriod, count, amount)
         self.createProductionOrder()
         self.actualizeDemand(amount)
 
@@ -977,41 +1075,42 @@ class Firm:
             prev_unfilled = self._cumulativeBacklogArray[idx - 1]
         self._cumulativeBacklogArray[idx] = prev_unfilled
 
-        for po in self.poList:
-            if po.id == poNumber:
-                incoming = po.fulfilledAmt
-                curInv   = self._wipInventory + self._fgInventory
-                spaceLeft = max(0, maxAllowed - curInv)
-
-                if spaceLeft >= incoming:
-                    # accept full shipment
-                    self._wipInventory += incoming
-                    shippedThisPeriod += incoming
+        # O(1) lookup of the open PO with this id, rather than scanning poList
+        po = self._poById.get(poNumber)
+        if po is not None:
+            incoming = po.fulfilledAmt
+            curInv   = self._wipInventory + self._fgInventory
+            spaceLeft = max(0, maxAllowed - curInv)
+
+            if spaceLeft >= incoming:
+                # accept full shipment
+                self._wipInventory += incoming
+                shippedThisPeriod += incoming
+                po.customerClosed = True
+
+                # reduce the unfilled backlog by “incoming” (because this WIP will become FG tomorrow)
+                new_unfilled = max(0, prev_unfilled - incoming)
+                self._cumulativeBacklogArray[idx] = new_unfilled
+
+            else:
+                # accept only what fits, reject the rest
+                accepted = spaceLeft
+                refused  = incoming - accepted
+
+                if accepted > 0:
+                    self._wipInventory += accepted
+                    shippedThisPeriod += accepted
+                    po.updatePO({'fulfilledAmt': accepted})
                     po.customerClosed = True
 
-                    # reduce the unfilled backlog by “incoming” (because this WIP will become FG tomorrow)
-                    new_unfilled = max(0, prev_unfilled - incoming)
+                    # reduce unfilled backlog by “accepted”
+                    new_unfilled = max(0, prev_unfilled - accepted)
                     self._cumulativeBacklogArray[idx] = new_unfilled
-
                 else:
-                    # accept only what fits, reject the rest
-                    accepted = spaceLeft
-                    refused  = incoming - accepted
-
-                    if accepted > 0:
-                        self._wipInventory += accepted
-                        shippedThisPeriod += accepted
-                        po.updatePO({'fulfilledAmt': accepted})
-                        po.customerClosed = True
-
-                        # reduce unfilled backlog by “accepted”
-                        new_unfilled = max(0, prev_unfilled - accepted)
-                        self._cumulativeBacklogArray[idx] = new_unfilled
-                    else:
-                        # no acceptance at all (so backlog stays the same as yesterday)
-                        self._cumulativeBacklogArray[idx] = prev_unfilled
+                    # no acceptance at all (so backlog stays the same as yesterday)
+                    self._cumulativeBacklogArray[idx] = prev_unfilled
 
-                    supply_refused += refused
+                supply_refused += refused
 
         # Now log WIP received into ledger
         self._ledger[idx, 2] = shippedThisPeriod       # total_wip_received
@@ -1035,11 +1134,9 @@ class Firm:
             extra_money      = supply_refused * money_per_unit
             self._actualizedCostMoneyArray[idx] += extra_money
 
-        logging.debug(
-            f"Firm {self._id}, t={self._timePeriod}, f=receiveWipOrder(): "
-            f"Accepted {shippedThisPeriod}, refused {supply_refused}, "
-            f"WIP now {self._wipInventory}, unfilled backlog now {self._cumulativeBacklogArray[idx]}"
-        )
+        logging.debug("Firm %s, t=%s, f=receiveWipOrder(): Accepted %s, refused %s, WIP now %s, unfilled backlog "
+                      "now %s", self._id, self._timePeriod, shippedThisPeriod, supply_refused, self._wipInventory,
+                      self._cumulativeBacklogArray[idx])
 
 
     # If we partially (or fully) refused, we leave the PO open so that the upstream firm
@@ -1056,32 +1153,32 @@ class Firm:
         self.setClassAttributes(demandMu)
         # This needs to be updated for the wholesaler class
         # ~~~~~~~~~~~~~~~~
-        self._actualizedDemandArray = np.zeros(self._totalTime, dtype=int)
-        self._actualizedCostMoneyArray = np.zeros(self._totalTime, dtype=float)
-        self._actualizedCostCO2Array   = np.zeros(self._totalTime, dtype=float)
-        self._actualizedCostWaterArray = np.zeros(self._totalTime, dtype=float)
-        self._actualizedCostElectricityArray = np.zeros(self._totalTime, dtype=float)
-        self._backlogArray = np.zeros(self._totalTime, dtype=int)
-        self._cumulativeBacklogArray = np.zeros(self._totalTime, dtype=int)
+        # The arrays allocated in __init__ are zeroed in place rather than reallocated. Simulation.getData copies their
+        # values out, so nothing outside the firm holds on to them between simulations
+        self._actualizedCosts.fill(0)  # All four cost arrays
+        self._backlogArray.fill(0)
+        self._cumulativeBacklogArray.fill(0)
 
         # alpha not reset
         self._closedCustomerPos = []
         self._closedSupplierPos = []
         # customerList not reset
         self.customerPoList = []
-        self._demandForecastArray = np.zeros(self._totalTime + self._shipDelay, dtype=int)
+        self._demandForecastArray.fill(0)
 
         # historyTime not reset
         # id not reset
-        self._ledger = np.zeros((self._historyTime, 18), dtype=int)
+        self._ledger.fill(0)  # Also clears actualizedDemandArray, which is a view of its actual_demand column
         self.poList = []
         self._producedPos = []
         self._productionOrder = 0
-        self._productionQueue = []
+        self._productionQueue.clear()
+        self._queueOrderAmt = 0
+        self._wipUsed = 0
         # runTime not reset
         # shipDelay not reset
         self._shippedPos = []
-        self._shippingQueue = []
+        self._shippingQueue.clear()
         # supplierList not reset
         self._timeIndex = self._historyTime
         self._timePeriod = 0
@@ -1089,7 +1186,7 @@ class Firm:
 
         # Sets desiredWipInventory, fgInventory, and wipInventory
         self.setClassAttributes(demandMu)
-        logging.info(f"Firm {self._id}, t={self._timePeriod}, f=resetFirm(): Firm reset.")
+        logging.info("Firm %s, t=%s, f=resetFirm(): Firm reset.", self._id, self._timePeriod)
 
     def sendCustomerShipments(self, timePeriod):
         """
@@ -1106,49 +1203,41 @@ class Firm:
             logging.warning(f"Firm {self._id}, t={self._timePeriod}, f=sendCustomerShipments(): No items shipped.")
             return False
         else:
-            self.warningLoop(self.shippingQueue, "sendCustomerShipments()")
-            for po in self.shippingQueue:
-                po.updatePO({'arrivalTime': timePeriod + self._shipDelay})
+            shippingQueue = self._shippingQueue
+            if __debug__ and len(shippingQueue) > 10:
+                logging.warning("Firm %s, t=%s, f=sendCustomerShipments(): Looping through a PO list of size %s",
+                                self._id, self._timePeriod, len(shippingQueue))
+            arrivalTime = timePeriod + self._shipDelay
+            shipPo = self._shippedPos.append
+            for po in shippingQueue:
+                po.updatePO({'arrivalTime': arrivalTime})
                 po.supplierClosed = True  # Make sure the PO is closed
-                self._fgInventory -= po.fulfilledAmt
                 shippedAmount += po.fulfilledAmt
-                self._shippedPos.append(po)
+                shipPo(po)
                 count += 1
-            self._shippingQueue = []  # Every time period empty out the shipping queue
+            self._fgInventory -= shippedAmount  # Everything shipped leaves the finished goods inventory at once
+            self._shippingQueue.clear()  # Every time period empty out the shipping queue
         self._ledger[self._timeIndex, 12] = shippedAmount  # total_fg_shipped column
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=sendCustomerShipments(): {count} customer PO's sent"
-                      f"with {shippedAmount} total product.")
+        logging.debug("Firm %s, t=%s, f=sendCustomerShipments(): %s customer PO's sent with %s total product.",
+                      self._id, self._timePeriod, count, shippedAmount)
         return True
 
     def sendData(self, option):
         """
         Returns firm-level data to be aggregated with firm-level data for other firms.
 
-        :param int option:
-            Takes two values, 'Ledger' or 'Demand'. Ledger sends the entire ledger, while demand sends only the
-            demand array.
+        :param str option:
+            Which data to send: 'Ledger' sends the entire ledger, and 'Demand', 'CostMoney', 'CostCO2', 'CostWater',
+            'Backlog', and 'Electricity' send that single array.
         :return: Specified data in ndArray form
         """
-        if option == 'Ledger':
-            logging.info(f"Firm {self._id}, t={self._timePeriod}, f=sendData(): Sent ledger data to simulation")
-            return self._ledger
-        elif option == 'Demand':
-            logging.info(f"Firm {self._id}, t={self._timePeriod}, f=sendData(): Sent demand data to simulation")
-            return self._actualizedDemandArray        
-        elif option == 'CostMoney':
-            return self._actualizedCostMoneyArray
-        elif option == 'CostCO2':
-            return self._actualizedCostCO2Array
-        elif option == 'CostWater':
-            return self._actualizedCostWaterArray
-        elif option == 'Backlog':
-            return self._backlogArray
-        elif option == 'Electricity':
-            return self._actualizedCostElectricityArray
-        else:
+        attribute = self._sendDataAttributes.get(option)
+        if attribute is None:
             message = f"Firm {self._id}, t={self._timePeriod}, f=sendData(): Unknown option chosen."
             logging.error(message)
             raise Exception(message)
+        logging.info("Firm %s, t=%s, f=sendData(): Sent %s data to simulation", self._id, self._timePeriod, option)
+        return getattr(self, attribute)
 
     def setClassAttributes(self, historicalWeeklyDemand):
         """
@@ -1161,8 +1250,8 @@ class Firm:
         self._desiredWipInventory = int(historicalWeeklyDemand * (1 + self._alpha))
         self._wipInventory = int(historicalWeeklyDemand * self._alpha)
         self._fgInventory = 0
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=setClassAttributes(): Created initial class "
-                      f"attributes")
+        logging.debug("Firm %s, t=%s, f=setClassAttributes(): Created initial class attributes",
+                      self._id, self._timePeriod)
 
     def setDemandArray(self, historicalWeeklyDemand):
         """
@@ -1172,10 +1261,9 @@ class Firm:
             The value that will be used for each week's historical demand.
         :return:
         """
-        for time in range(self._historyTime):
-            self._actualizedDemandArray[time] = historicalWeeklyDemand
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=setDemandArray(): Set historical values in demand "
-                      f"array")
+        self._actualizedDemandArray[:self._historyTime] = historicalWeeklyDemand
+        logging.debug("Firm %s, t=%s, f=setDemandArray(): Set historical values in demand array",
+                      self._id, self._timePeriod)
 
     def setForecast(self, historicalWeeklyDemand):
         """
@@ -1185,9 +1273,9 @@ class Firm:
             The value that will be used for each week's historical demand.
         :return: None
         """
-        for time in range(self._totalTime):
-            self._demandForecastArray[time] = historicalWeeklyDemand
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=setForecast(): Created initial demand forecast array")
+        self._demandForecastArray[:self._totalTime] = historicalWeeklyDemand
+        logging.debug("Firm %s, t=%s, f=setForecast(): Created initial demand forecast array",
+                      self._id, self._timePeriod)
 
     def setHistoricalLedger(self, historicalWeeklyDemand):
         """
@@ -1197,31 +1285,27 @@ class Firm:
             The value that will be used for each week's historical demand.
         :return:
         """
-        for time in range(self._historyTime):
-            if time == 0:
-                self._ledger[-time, 0] = -self._historyTime  # time column
-            else:
-                self._ledger[-time, 0] = -time  # time column
-            self._ledger[time, 1] = self._wipInventory  # beginning_wip_inventory
-            self._ledger[time, 2] = historicalWeeklyDemand  # total_wip_received
-            self._ledger[time, 3] = historicalWeeklyDemand + self._wipInventory  # production_wip_inventory
-            self._ledger[time, 4] = historicalWeeklyDemand  # wip_used_in_production
-            self._ledger[time, 5] = self._wipInventory  # ending_wip_inventory
-            self._ledger[time, 6] = historicalWeeklyDemand  # total_wip_ordered
-            self._ledger[time, 7] = self._fgInventory  # beginning_fg_inventory
-            self._ledger[time, 9] = historicalWeeklyDemand  # total_new_production_orders
-            self._ledger[time, 10] = historicalWeeklyDemand  # total_fg_produced
-            self._ledger[time, 11] = historicalWeeklyDemand  # fg_inventory_after_production
-            self._ledger[time, 12] = historicalWeeklyDemand  # total_fg_shipped
-            self._ledger[time, 13] = self._fgInventory  # ending_fg_inventory
-            self._ledger[time, 14] = historicalWeeklyDemand * (self._shipDelay - 1)  # wip_in_transit
-            self._ledger[time, 15] = self._desiredWipInventory  # desired_wip_inventory
-            self._ledger[time, 16] = historicalWeeklyDemand  # forecasted_demand
-            self._ledger[time, 17] = historicalWeeklyDemand  # actual_demand
-        # Add on the extra rows for the simulation time
-        rows = np.zeros((self._runTime, 18), dtype=int)
-        self._ledger = np.vstack((self._ledger, rows))
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=setHistoricalLedger(): Set historical data in ledger")
+        # Every history row holds the same values, so each column is filled with one slice assignment
+        history = self._ledger[:self._historyTime]
+        history[:, 0] = np.arange(-self._historyTime, 0)  # time column, -historyTime up to -1
+        history[:, 1] = self._wipInventory  # beginning_wip_inventory
+        history[:, 2] = historicalWeeklyDemand  # total_wip_received
+        history[:, 3] = historicalWeeklyDemand + self._wipInventory  # production_wip_inventory
+        history[:, 4] = historicalWeeklyDemand  # wip_used_in_production
+        history[:, 5] = self._wipInventory  # ending_wip_inventory
+        history[:, 6] = historicalWeeklyDemand  # total_wip_ordered
+        history[:, 7] = self._fgInventory  # beginning_fg_inventory
+        history[:, 9] = historicalWeeklyDemand  # total_new_production_orders
+        history[:, 10] = historicalWeeklyDemand  # total_fg_produced
+        history[:, 11] = historicalWeeklyDemand  # fg_inventory_after_production
+        history[:, 12] = historicalWeeklyDemand  # total_fg_shipped
+        history[:, 13] = self._fgInventory  # ending_fg_inventory
+        history[:, 14] = historicalWeeklyDemand * (self._shipDelay - 1)  # wip_in_transit
+        history[:, 15] = self._desiredWipInventory  # desired_wip_inventory
+        history[:, 16] = historicalWeeklyDemand  # forecasted_demand
+        # actual_demand (column 17) is actualizedDemandArray, which setDemandArray fills
+        logging.debug("Firm %s, t=%s, f=setHistoricalLedger(): Set historical data in ledger",
+                      self._id, self._timePeriod)
 
     def setHistoricalReturnArray(self, historicalWeeklyDemand):
         """
@@ -1242,8 +1326,8 @@ class Firm:
         self._ledger[self._timeIndex, 1] = self._wipInventory  # beginning_wip_inventory
         self._ledger[self._timeIndex, 7] = self._fgInventory  # beginning_fg_inventory
         self._ledger[self._timeIndex, 15] = self._desiredWipInventory  # desired_wip_inventory
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=timeZeroSetup(): Established beginning of time period "
-                      f"data")
+        logging.debug("Firm %s, t=%s, f=timeZeroSetup(): Established beginning of time period data",
+                      self._id, self._timePeriod)
 
     def updateDemandForecast(self, smoothingValue):
         """
@@ -1260,41 +1344,19 @@ class Firm:
         :return:
         """
         newDemand = self.calculateFutureDemand(smoothingValue)
-        self._desiredWipInventory = int(newDemand * (1 + self._alpha))
-        if self._timeIndex + 1 < self._totalTime:
-            self._ledger[self._timeIndex + 1, 15] = self._desiredWipInventory  # desired_wip_inventory column
-        count = 0
-        # Prevent index out of bound error
-        if self._timeIndex + self._shipDelay + 1 >= len(self._demandForecastArray):
-            endTime = len(self._demandForecastArray)
-        else:
-            endTime = self._timeIndex + self._shipDelay + 1
-        # Update demand forecast for future time periods [t + 1, t + shipDelay + 1]
-        for t in range(self._timeIndex + 1, endTime):
-            self._demandForecastArray[t] = newDemand
-            count += 1
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=updateDemandForecast(): Updated {count} total demand "
-                      f"forecasts with demand value of {newDemand}. Changed desiredWipInventory to "
-                      f"{self._desiredWipInventory}.")
-
-    def warningLoop(self, listToCheck, funcName):
-        """
-        A function used for logging purposes. Will check the length of a list that is about to be looped through.
-        Will output a warning in the log if the list is longer than 10. This helps to identify potential causes of
-        long processing times.
-
-        :param list listToCheck:
-            A list object that is about to be looped through
-        :param string funcName:
-            The name of the function that the warningLoop was called in
-
-        :return:
-        """
-        length = len(listToCheck)
-        if length > 10:
-            logging.warning(
-                f"Firm {self._id}, t={self._timePeriod}, f=warningLoop(): Looping through a PO list of size "
-                f"{length} in function {funcName}")
+        desiredWipInventory = int(newDemand * (1 + self._alpha))
+        self._desiredWipInventory = desiredWipInventory
+        start = self._timeIndex + 1
+        if start < self._totalTime:
+            self._ledger[start, 15] = desiredWipInventory  # desired_wip_inventory column
+        # Update demand forecast for future time periods [t + 1, t + shipDelay + 1], clamped to the end of the array
+        forecast = self._demandForecastArray
+        endTime = min(start + self._shipDelay, len(forecast))
+        forecast[start:endTime] = newDemand
+        count = max(0, endTime - start)
+        logging.debug("Firm %s, t=%s, f=updateDemandForecast(): Updated %s total demand forecasts with demand value of "
+                      "%s. Changed desiredWipInventory to %s.",
+                      self._id, self._timePeriod, count, newDemand, self._desiredWipInventory)
 
 
 class Retailer(Firm):
@@ -1304,6 +1366,8 @@ class Retailer(Firm):
     Currently does not override any methods.
     """
 
+    __slots__ = ()
+
     def __init__(self,
                  alpha,
                  runTime,
@@ -1446,6 +1510,10 @@ class Wholesaler(Firm):
 
     """
 
+    __slots__ = ('_fulfilledBySupplier', '_historicalPortfolio', '_historicalReturnRuleOption',
+                 '_numTimePeriodsForCalc', '_ordersBySupplier', '_returnBySupplier', '_returnBySupplierForCalc',
+                 'covarianceMatrix', 'riskTolerance', 'wholesalerProfile', 'wholesalerProfileOption')
+
     def __init__(self,
                  alpha,
                  runTime,
@@ -1485,14 +1553,12 @@ class Wholesaler(Firm):
         self.covarianceMatrix = covarianceMatrix
 
         self._fulfilledBySupplier = np.zeros((self._totalTime, 2), dtype=int)
-        logging.debug(
-            f"Firm {self._id}, t=SETUP: Established fulfilledBySupplier of type {type(self._ledger)} and size "
-            f"[{self._totalTime} x 2]")
+        logging.debug("Firm %s, t=SETUP: Established fulfilledBySupplier of type %s and size [%s x 2]",
+                      self._id, type(self._ledger), self._totalTime)
 
         self._historicalPortfolio = np.zeros((self._totalTime, 2), dtype=float)
-        logging.debug(
-            f"Firm {self._id}, t=SETUP: Established historicalPortfolio of type {type(self._ledger)} and size "
-            f"[{self._totalTime} x 2]")
+        logging.debug("Firm %s, t=SETUP: Established historicalPortfolio of type %s and size [%s x 2]",
+                      self._id, type(self._ledger), self._totalTime)
 
         self._historicalReturnRuleOption = historicalReturnRuleOption
         if not (self._historicalReturnRuleOption == 1 or self._historicalReturnRuleOption == 2 or
@@ -1512,19 +1578,16 @@ class Wholesaler(Firm):
             raise TypeError(message)
 
         self._ordersBySupplier = np.zeros((self._totalTime, 2), dtype=int)
-        logging.debug(
-            f"Firm {self._id}, t=SETUP: Established ordersBySupplier of type {type(self._ledger)} and size "
-            f"[{self._totalTime} x 2]")
+        logging.debug("Firm %s, t=SETUP: Established ordersBySupplier of type %s and size [%s x 2]",
+                      self._id, type(self._ledger), self._totalTime)
 
         self._returnBySupplier = np.zeros((self._totalTime, 2), dtype=float)
-        logging.debug(
-            f"Firm {self._id}, t=SETUP: Established returnBySupplier of type {type(self._ledger)} and size "
-            f"[{self._totalTime} x 2]")
+        logging.debug("Firm %s, t=SETUP: Established returnBySupplier of type %s and size [%s x 2]",
+                      self._id, type(self._ledger), self._totalTime)
 
         self._returnBySupplierForCalc = np.zeros((self._numTimePeriodsForCalc, 2), dtype=float)
-        logging.debug(
-            f"Firm {self._id}, t=SETUP: Established returnBySupplierForCalc of type {type(self._ledger)} and size "
-            f"[{self._numTimePeriodsForCalc} x 2]")
+        logging.debug("Firm %s, t=SETUP: Established returnBySupplierForCalc of type %s and size [%s x 2]",
+                      self._id, type(self._ledger), self._numTimePeriodsForCalc)
 
         self.riskTolerance = riskTolerance
         if self.riskTolerance <= 0:
@@ -1546,7 +1609,7 @@ class Wholesaler(Firm):
             message = "Length of wholesaler profile must be 2"
             logging.error(message)
             raise Exception(message)
-        if sum(self.wholesalerProfile) != 1:
+        if not math.isclose(self.wholesalerProfile[0] + self.wholesalerProfile[1], 1.0, abs_tol=1e-9):
             message = "Sum of wholesaler profile must equal 1"
             logging.error(message)
             raise Exception(message)
@@ -1572,27 +1635,32 @@ class Wholesaler(Firm):
         :return:
         """
         # Might be overridden by logSupplyPo
-        self.warningLoop(self.poList, "beginningOfDay()")
+        if __debug__ and len(self.poList) > 10:
+            logging.warning("Firm %s, t=%s, f=beginningOfDay(): Looping through a PO list of size %s",
+                            self._id, self._timePeriod, len(self.poList))
+        # The previous time period and its row, computed once rather than for every PO
+        previousTime = self._timePeriod - 1
+        previousIndex = self._timeIndex - 1
         for po in self.poList:
-            if po.orderTime == self._timePeriod - 1:
+            if po.orderTime == previousTime:
                 if po.supplier == 2:
-                    self._fulfilledBySupplier[self._timeIndex - 1, 0] = po.fulfilledAmt
+                    self._fulfilledBySupplier[previousIndex, 0] = po.fulfilledAmt
                     # First if statement is here to avoid a runtime long_scalar warning
-                    if self._ordersBySupplier[self._timeIndex - 1, 0] == 0:
+                    if self._ordersBySupplier[previousIndex, 0] == 0:
                         amount = 0
                     else:
-                        amount = self._fulfilledBySupplier[self._timeIndex - 1, 0] / \
-                                 self._ordersBySupplier[self._timeIndex - 1, 0]
-                    self._returnBySupplier[self._timeIndex - 1, 0] = amount
+                        amount = self._fulfilledBySupplier[previousIndex, 0] / \
+                                 self._ordersBySupplier[previousIndex, 0]
+                    self._returnBySupplier[previousIndex, 0] = amount
                 elif po.supplier == 3:
-                    self._fulfilledBySupplier[self._timeIndex - 1, 1] = po.fulfilledAmt
+                    self._fulfilledBySupplier[previousIndex, 1] = po.fulfilledAmt
                     # First if statement is here to avoid a runtime long_scalar warning
-                    if self._ordersBySupplier[self._timeIndex - 1, 1] == 0:
+                    if self._ordersBySupplier[previousIndex, 1] == 0:
                         amount = 0
                     else:
-                        amount = self._fulfilledBySupplier[self._timeIndex - 1, 1] / \
-                                 self._ordersBySupplier[self._timeIndex - 1, 1]
-                    self._returnBySupplier[self._timeIndex - 1, 1] = amount
+                        amount = self._fulfilledBySupplier[previousIndex, 1] / \
+                                 self._ordersBySupplier[previousIndex, 1]
+                    self._returnBySupplier[previousIndex, 1] = amount
         # If it is the first timePeriod, initialize
         if self._timePeriod == 0:
             start = self._timeIndex - self._numTimePeriodsForCalc
@@ -1600,7 +1668,7 @@ class Wholesaler(Firm):
             self._returnBySupplierForCalc = self._returnBySupplier[start:end, :]
         else:
             # Sets the return by supplier array used for calculations for the previous timePeriod
-            self.setReturnBySupplierForCalc(self._timeIndex - 1)
+            self.setReturnBySupplierForCalc(previousIndex)
 
     def calculateCovariance(self, timePeriods):
         """
@@ -1671,11 +1739,9 @@ class Wholesaler(Firm):
             A list of PO objects
         """
         orderList = self.calculateWipOrder(orderAmount)
-        newPoList = []
-        self.warningLoop(orderList, "createSupplyOrders()")
-        for supplier, amount in zip(self.supplierList, orderList):
-            newPo = self.createPo(supplier, amount, self._timePeriod)
-            newPoList.append(newPo[0])
+        newPoList = [PO.PO(self._id, supplier, amount, self._timePeriod)
+                     for supplier, amount in zip(self.supplierList, orderList)]
+        self._registerPos(newPoList)
         self._ordersBySupplier[self._timePeriod + self._historyTime, 0] = orderList[0]
         self._ordersBySupplier[self._timePeriod + self._historyTime, 1] = orderList[1]
         return newPoList
@@ -1691,35 +1757,34 @@ class Wholesaler(Firm):
         :return:
         """
         timeIndex -= self.shipDelay
-        self.warningLoop(self.poList, "logSupplyPo()")
-        for po in self.poList:
-            if poNumber == po.id:
-                if po.supplier == 2:
-                    # This first if statement is put in to avoid a runtime warning regarding "long scalars"
-                    if self._ordersBySupplier[timeIndex, 0] == 0:
-                        if po.fulfilledAmt > 0:
-                            raise Exception("Fulfilled amount larger than ordered amount")
-                        else:
-                            self._fulfilledBySupplier[timeIndex, 0] = 0
-                            # self._returnBySupplier[timeIndex, 0] = 1
+        po = self._poById.get(poNumber)
+        if po is not None:
+            if po.supplier == 2:
+                # This first if statement is put in to avoid a runtime warning regarding "long scalars"
+                if self._ordersBySupplier[timeIndex, 0] == 0:
+                    if po.fulfilledAmt > 0:
+                        raise Exception("Fulfilled amount larger than ordered amount")
                     else:
-                        self._fulfilledBySupplier[timeIndex, 0] = po.fulfilledAmt
-                        amount = self._fulfilledBySupplier[timeIndex, 0] / self._ordersBySupplier[timeIndex, 0]
-                        self._returnBySupplier[timeIndex, 0] = amount
-                elif po.supplier == 3:
-                    # This first if statement is put in to avoid a runtime warning regarding "long scalars"
-                    if self._ordersBySupplier[timeIndex, 1] == 0:
-                        if po.fulfilledAmt > 0:
-                            raise Exception("Fulfilled amount larger than ordered amount")
-                        else:
-                            self._fulfilledBySupplier[timeIndex, 1] = 0
-                            # self._returnBySupplier[timeIndex, 1] = 1
+                        self._fulfilledBySupplier[timeIndex, 0] = 0
+                        # self._returnBySupplier[timeIndex, 0] = 1
+                else:
+                    self._fulfilledBySupplier[timeIndex, 0] = po.fulfilledAmt
+                    amount = self._fulfilledBySupplier[timeIndex, 0] / self._ordersBySupplier[timeIndex, 0]
+                    self._returnBySupplier[timeIndex, 0] = amount
+            elif po.supplier == 3:
+                # This first if statement is put in to avoid a runtime warning regarding "long scalars"
+                if self._ordersBySupplier[timeIndex, 1] == 0:
+                    if po.fulfilledAmt > 0:
+                        raise Exception("Fulfilled amount larger than ordered amount")
                     else:
-                        self._fulfilledBySupplier[timeIndex, 1] = po.fulfilledAmt
-                        amount = self._fulfilledBySupplier[timeIndex, 1] / self._ordersBySupplier[timeIndex, 1]
-                        self._returnBySupplier[timeIndex, 1] = amount
+                        self._fulfilledBySupplier[timeIndex, 1] = 0
+                        # self._returnBySupplier[timeIndex, 1] = 1
                 else:
-                    raise Exception("Error in logging supply PO")
+                    self._fulfilledBySupplier[timeIndex, 1] = po.fulfilledAmt
+                    amount = self._fulfilledBySupplier[timeIndex, 1] / self._ordersBySupplier[timeIndex, 1]
+                    self._returnBySupplier[timeIndex, 1] = amount
+            else:
+                raise Exception("Error in logging supply PO")
 
     def setHistoricalReturnArray(self, historicalWeeklyDemand):
         """
@@ -1834,12 +1899,12 @@ class Wholesaler(Firm):
         # returnBySupplier = np.transpose(self._returnBySupplier)
         # df = pd.DataFrame(returnBySupplier[:, startTime:self._timeIndex - 1])
         returnBySupplier = np.transpose(self._returnBySupplierForCalc)
-        df = pd.DataFrame(returnBySupplier)
-        # Calculate expected return
-        E = np.array(df.mean(axis=1)).reshape(-1, 1)  # Axis=1 averages across the rows, -1 sets unspecified
+        # Calculate expected return. nanmean skips missing values the way the DataFrame mean this replaced did
+        E = np.nanmean(returnBySupplier, axis=1).reshape(-1, 1)  # Axis=1 averages across the rows, -1 sets unspecified
         W = np.ones((E.shape[0], 1)) * (1.0 / E.shape[0])  # W sums to 1
 
         def optimize(func, W, expReturn, covariance, riskProfile):
+            from scipy.optimize import minimize, Bounds  # Imported here so runs that never optimize do not load scipy
             optBounds = Bounds(0, 1)  # Weights have to be between 0 and 1
             optConstraints = ({'type': 'eq',
                                'fun': lambda W: 1.0 - np.sum(W)},
@@ -1883,6 +1948,8 @@ class Manufacturer(Firm):
          Calculates the historical demand, taking into account the chosen value for wholesalerProfile
     """
 
+    __slots__ = ()
+
     def __init__(self,
                  alpha,
                  runTime,
@@ -1948,6 +2015,8 @@ class RawMaterials(Firm):
         Creates PO objects representing the focal firms supply orders.
     """
 
+    __slots__ = ()
+
     def __init__(self,
                  alpha,
                  runTime,
@@ -1988,11 +2057,11 @@ class RawMaterials(Firm):
         orderAmt = int(orderAmount / len(self.supplierList))
         newPoList = []
         newPo = self.createPo(self.supplierList[0], orderAmt, self._timePeriod)
-        newPo[0].updatePO({"fulfilledAmt": orderAmt,
-                           "fulfilledTime": self._timePeriod,
-                           "arrivalTime": self._timePeriod + self._shipDelay})
-        newPo[0].supplierClosed = True
-        newPoList.append(newPo[0])
-        logging.debug(f"Firm {self._id}, t={self._timePeriod}, f=createSupplyOrders(): Created a new supply order "
-                      f"of amount {orderAmount}.")
+        newPo.updatePO({"fulfilledAmt": orderAmt,
+                        "fulfilledTime": self._timePeriod,
+                        "arrivalTime": self._timePeriod + self._shipDelay})
+        newPo.supplierClosed = True
+        newPoList.append(newPo)
+        logging.debug("Firm %s, t=%s, f=createSupplyOrders(): Created a new supply order of amount %s.",
+                      self._id, self._timePeriod, orderAmount)
         return newPoList
\ No newline at end of file
@@ -1,4 +1,3 @@
-import matplotlib.pyplot as plt
 import numpy as np
 import logging
 
@@ -55,26 +54,26 @@ def main():
     """
     No further input needed
     """
-    configs1 = Configs(runTime=runTime,
-                       alphaOption=alphaOption,
-                       alphaValueList=alphaValueList,
-                       alphaValue=alphaValue,
-                       demandMu=demandMu,
-                       demandStd=demandStd,
-                       historyTime=historyTime,
-                       numIterations=numIterations,
-                       shipDelayOption=shipDelayOption,
-                       shipDelayList=shipDelayList,
-                       shipDelayValue=shipDelayValue,
-                       shocks=shocks,
-                       smoothingValue=smoothingValue,
-                       wholesalerProfileOption=wholesalerProfileOption,
-                       wholesalerProfile=wholesalerProfile,
-                       covarianceMatrix=covarianceMatrix,
-                       historicalReturnRuleOption=historicalReturnRuleOption,
-                       numTimePeriodsForCalc=numTimePeriodsForCalc,
-                       riskTolerance=riskTolerance,
-                       )
+    configs1 = Configs.build(runTime=runTime,
+                             alphaOption=alphaOption,
+                             alphaValueList=alphaValueList,
+                             alphaValue=alphaValue,
+                             demandMu=demandMu,
+                             demandStd=demandStd,
+                             historyTime=historyTime,
+                             numIterations=numIterations,
+                             shipDelayOption=shipDelayOption,
+                             shipDelayList=shipDelayList,
+                             shipDelayValue=shipDelayValue,
+                             shocks=shocks,
+                             smoothingValue=smoothingValue,
+                             wholesalerProfileOption=wholesalerProfileOption,
+                             wholesalerProfile=wholesalerProfile,
+                             covarianceMatrix=covarianceMatrix,
+                             historicalReturnRuleOption=historicalReturnRuleOption,
+                             numTimePeriodsForCalc=numTimePeriodsForCalc,
+                             riskTolerance=riskTolerance,
+                             )
     experiment1 = Experiment(savePath, configs1, startingExperimentNumber=startingExperimentNumber)
     experiment1.setup()
     experiment1.run()
@@ -84,26 +83,26 @@ def main():
     """
     Input changed parameters here
     """
-    configs2 = Configs(runTime=runTime,
-                       alphaOption=alphaOption,
-                       alphaValueList=alphaValueList,
-                       alphaValue=alphaValue,
-                       demandMu=demandMu,
-                       demandStd=demandStd,
-                       historyTime=historyTime,
-                       numIterations=numIterations,
-                       shipDelayOption=shipDelayOption,
-                       shipDelayList=shipDelayList,
-                       shipDelayValue=shipDelayValue,
-                       shocks=shocks,
-                       smoothingValue=smoothingValue,
-                       wholesalerProfileOption=wholesalerProfileOption,
-                       wholesalerProfile=wholesalerProfile,
-                       covarianceMatrix=covarianceMatrix,
-                       historicalReturnRuleOption=historicalReturnRuleOption,
-                       numTimePeriodsForCalc=numTimePeriodsForCalc,
-                       riskTolerance=0.5,
-                       )
+    configs2 = Configs.build(runTime=runTime,
+                             alphaOption=alphaOption,
+                             alphaValueList=alphaValueList,
+                             alphaValue=alphaValue,
+                             demandMu=demandMu,
+                             demandStd=demandStd,
+                             historyTime=historyTime,
+                             numIterations=numIterations,
+                             shipDelayOption=shipDelayOption,
+                             shipDelayList=shipDelayList,
+                             shipDelayValue=shipDelayValue,
+                             shocks=shocks,
+                             smoothingValue=smoothingValue,
+                             wholesalerProfileOption=wholesalerProfileOption,
+                             wholesalerProfile=wholesalerProfile,
+                             covarianceMatrix=covarianceMatrix,
+                             historicalReturnRuleOption=historicalReturnRuleOption,
+                             numTimePeriodsForCalc=numTimePeriodsForCalc,
+                             riskTolerance=0.5,
+                             )
     """
     No further input needed
     """
@@ -116,26 +115,26 @@ def main():
     """
     Input changed parameters here
     """
-    configs3 = Configs(runTime=runTime,
-                       alphaOption=alphaOption,
-                       alphaValueList=alphaValueList,
-                       alphaValue=alphaValue,
-                       demandMu=demandMu,
-                       demandStd=demandStd,
-                       historyTime=historyTime,
-                       numIterations=numIterations,
-                       shipDelayOption=shipDelayOption,
-                       shipDelayList=shipDelayList,
-                       shipDelayValue=shipDelayValue,
-                       shocks=shocks,
-                       smoothingValue=smoothingValue,
-                       wholesalerProfileOption=wholesalerProfileOption,
-                       wholesalerProfile=wholesalerProfile,
-                       covarianceMatrix=covarianceMatrix,
-                       historicalReturnRuleOption=historicalReturnRuleOption,
-                       numTimePeriodsForCalc=numTimePeriodsForCalc,
-                       riskTolerance=0.8,
-                       )
+    configs3 = Configs.build(runTime=runTime,
+                             alphaOption=alphaOption,
+                             alphaValueList=alphaValueList,
+                             alphaValue=alphaValue,
+                             demandMu=demandMu,
+                             demandStd=demandStd,
+                             historyTime=historyTime,
+                             numIterations=numIterations,
+                             shipDelayOption=shipDelayOption,
+                             shipDelayList=shipDelayList,
+                             shipDelayValue=shipDelayValue,
+                             shocks=shocks,
+                             smoothingValue=smoothingValue,
+                             wholesalerProfileOption=wholesalerProfileOption,
+                             wholesalerProfile=wholesalerProfile,
+                             covarianceMatrix=covarianceMatrix,
+                             historicalReturnRuleOption=historicalReturnRuleOption,
+                             numTimePeriodsForCalc=numTimePeriodsForCalc,
+                             riskTolerance=0.8,
+                             )
     """
     No further input needed
     """
@@ -1,6 +1,6 @@
 import itertools
 import logging
-import matplotlib.pyplot as plt
+import random
 import time
 import math 
 import numpy as np
@@ -75,6 +75,9 @@ class Simulation:
         The total time periods including history time. totalTime = historyTime + runTime
     testOption: Bool
         (Currently not implemented) Sets the simulation into test mode, enabling some features and disabling others
+    dataOptions: tuple
+        The sendData options collected by getData, in the order they are stacked: demand, money cost, CO2 cost, water
+        cost, backlog, electricity
 
     Class Methods
     ---------
@@ -161,7 +164,8 @@ class Simulation:
         The function gathers up all such PO's (for some firms there will be multiple orders). It then calls the Firm3
         function receiveCustomerDemand(...) which handles internal processing of the order.
     production(agent):
-        A  function to represent the real-life production process
+        A  function to represent the real-life production process. Production queues are shuffled with the simulation's
+        own random generator
 
         The simulation calls the Firm3 function production(...) which handles the internal production process.
     sendShipments(agent):
@@ -216,6 +220,8 @@ class Simulation:
     totalTime = None
     testOption = False
     agentList = None
+    # sendData options, in the order getData stacks them
+    dataOptions = ('Demand', 'CostMoney', 'CostCO2', 'CostWater', 'Backlog', 'Electricity')
 
     @classmethod
     def initializeClass(cls, configs, agentList, testOption=False):
@@ -240,9 +246,18 @@ class Simulation:
         cls.kwh_per_pallet_per_day = configs.kwh_per_pallet_per_day
         cls.pallet_weight_lb       = configs.pallet_weight_lb
 
-    def __init__(self):
+    def __init__(self, seed=None, shuffleRandom=None):
+        """
+        :param seed:
+            Optional seed (int or np.random.SeedSequence) for the simulation's random number generator. A fresh,
+            unpredictable seed is used if None.
+        :param random.Random shuffleRandom:
+            Optional generator the firms' production queues are shuffled with. The random module's global generator
+            is used if None.
+        """
         #self._id = next(self.idIter)  # Creates a new unique identifier for the simulation
-        self._rng = rand.default_rng()
+        self._rng = rand.default_rng(seed)
+        self._shuffleRandom = random if shuffleRandom is None else shuffleRandom
         self._timePeriod = 0  # Every simulation starts at time period 0
         if self.historyTime is None:
             raise Exception("Class not initialized")
@@ -572,8 +587,7 @@ class Simulation:
         toc = time.perf_counter()
         return toc - tic
 
-    @staticmethod
-    def production(agent):
+    def production(self, agent):
         """
         A  function to represent the real-life production process
 
@@ -587,7 +601,7 @@ class Simulation:
         # Baseline  performance for 1 sim: 0.43s (optimized) 0.43s (default)
         # Current  performance for 1 sim: 0.34s (optimized) 0.41s (default)
         tic = time.perf_counter()
-        agent.production()
+        agent.production(self._shuffleRandom)
         toc = time.perf_counter()
         return toc - tic
 
@@ -721,21 +735,40 @@ class Simulation:
         for agent in self.agentList:
             agent.resetFirm(self.demandMu)
 
-    def processData(self, simNo):
+    def processData(self, simNo, out=None):
         """
         Calls getData() function and processes for analysis.
         :param simNo:
+        :param np.ndarray out:
+            Optional (6, numAgents, totalTime) array. If given, the data is written into it instead of into newly
+            allocated arrays, see getData()
         :return:
         """
-        self.getData()
+        self.getData(out)
         # self.plotData(simNo)
         return self._demandData, self._costMoneyData, self._costCO2Data, self._costWaterData, self._backlogData, self._electricityData
 
-    def getData(self):
+    def getData(self, out=None):
         """
         Calls firm method sendData and saves data to simulation-level array
+
+        :param np.ndarray out:
+            Optional (6, numAgents, totalTime) array the data is copied into, in the order demand, money cost, CO2
+            cost, water cost, backlog, electricity. The simulation-level arrays are then views into out.
         :return:
         """
+        if out is not None:
+            for dataIndex, option in enumerate(self.dataOptions):
+                for agentIndex, agent in enumerate(self.agentList):
+                    out[dataIndex, agentIndex] = agent.sendData(option)
+            (self._demandData,
+             self._costMoneyData,
+             self._costCO2Data,
+             self._costWaterData,
+             self._backlogData,
+             self._electricityData) = out
+            return self._demandData, self._costMoneyData, self._costCO2Data, self._costWaterData, self._backlogData
+
         demandDataList = []
         for agent in self.agentList:
             demandData = agent.sendData('Demand')
@@ -781,6 +814,8 @@ class Simulation:
         :param simNo:
         :return:
         """
+        import matplotlib.pyplot as plt  # Only needed when plotting, so not imported with the module
+
         # Demand Data
         plt.figure(1)
         chartTitle = f"Demand Chart, Sim {simNo}"